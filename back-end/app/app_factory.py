@@ -1,46 +1,186 @@
 """
 Main Flask application factory and configuration.
+
+Importing this module and calling create_app() have no side effects beyond
+building the app, installing logging and queueing the dummy password hash
+on the bcrypt pool: the MongoDB connection, and everything that depends on
+it, is set up on first use.
 """
-from flask import Flask
+import time
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from config.config import DevelopmentConfig
 from app.database import database_manager
+from app.utils.json_provider import MongoJSONProvider
+from app.utils.log import configure_logging
 
 def create_app(config_class=DevelopmentConfig):
     """
     Application factory pattern for creating Flask app instance.
     """
+    # Structured logs through a background writer (once per process)
+    configure_logging(config_class)
+    
     # Create Flask app instance
     app = Flask(__name__)
     
     # Load configuration
     app.config.from_object(config_class)
     
+    # Serialize responses with the MongoDB-aware JSON provider
+    app.json = MongoJSONProvider(app)
+    
     # Initialize CORS
     CORS(app)
     
-    # Initialize database connection
-    database_manager.connect()
+    # Compute the dummy hash for unknown-email logins off the request path
+    from app.utils.auth_utils import password_hasher
+    password_hasher.prepare_dummy_hash()
+    
+    # Configure the process-wide database manager; it connects on first use
+    database_manager.init_app(app, config_class)
+    database_manager.on_connect(init_services)
+    
+    # Time every request and serve /metrics
+    if app.config.get('METRICS_ENABLED', True):
+        register_metrics(app)
+    
+    # Reject oversized request bodies before any view reads them
+    register_request_limits(app)
     
     # Register blueprints
     from app.routes.main import main_bp
     from app.routes.auth import auth_bp
     from app.routes.services import services_bp
+    from app.routes.grama_niladhari import grama_niladhari_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(services_bp)
+    app.register_blueprint(grama_niladhari_bp)
     
     return app
 
-# Initialize user model after database connection
-def init_models():
-    """Initialize models after database connection is established."""
-    from app.models.user import user_model
-    return user_model
+def register_request_limits(app):
+    """
+    Enforce MAX_CONTENT_LENGTH from the Content-Length header, ahead of the
+    views' own error handling, and answer 413 with JSON.
+    """
+    @app.before_request
+    def reject_oversized_body():
+        limit = app.config.get('MAX_CONTENT_LENGTH')
+        if limit is not None and (request.content_length or 0) > limit:
+            return request_too_large(None)
+    
+    @app.errorhandler(413)
+    def request_too_large(error):
+        return jsonify({'error': 'Request body too large'}), 413
 
-# Create application instance
-app = create_app()
+def register_metrics(app):
+    """
+    Record per-endpoint latency, status codes, payload sizes and stage
+    timings for every request, and expose them on /metrics.
+    """
+    from app.utils import metrics as m
+    
+    def endpoint_label():
+        rule = request.url_rule
+        return rule.rule if rule is not None else 'unmatched'
+    
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        m.REQUESTS_IN_FLIGHT.inc()
+        m.start_request()
+        
+        if request.content_length:
+            m.REQUEST_SIZE.observe(request.content_length, (endpoint_label(),))
+    
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        
+        endpoint = endpoint_label()
+        m.REQUEST_DURATION.observe(time.perf_counter() - started, (endpoint, request.method))
+        m.REQUESTS.inc((endpoint, request.method, str(response.status_code)))
+        
+        if response.content_length is not None:
+            m.RESPONSE_SIZE.observe(response.content_length, (endpoint,))
+        for stage, seconds in m.finish_request().items():
+            m.REQUEST_STAGE_SECONDS.inc((endpoint, stage), seconds)
+        
+        g.metrics_recorded = True
+        return response
+    
+    @app.teardown_request
+    def leave_in_flight(error=None):
+        # Runs even when after_request did not (e.g. the response failed to build)
+        if g.pop('metrics_recorded', False) or g.pop('metrics_started', None) is not None:
+            m.REQUESTS_IN_FLIGHT.dec()
+            m.finish_request()
+    
+    def database_up():
+        return 1 if database_manager.health_status()['status'] == 'connected' else 0
+    
+    def submission_queue_pending():
+        from app.services.submission_queue import submission_queue
+        return len(submission_queue) if submission_queue.running else None
+    
+    m.metrics.gauge_callback('gramaconnect_database_up', 'Whether MongoDB is reachable', database_up)
+    m.metrics.gauge_callback('gramaconnect_submission_queue_pending',
+                             'Journaled applications not yet written to MongoDB', submission_queue_pending)
+    
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return app.response_class(m.metrics.render(), mimetype='text/plain; version=0.0.4')
 
-# Initialize models
-init_models()
+def init_services(db):
+    """
+    Prepare database-backed services; runs after every (re)connection.
+    
+    Args:
+        db (Database): The newly connected database
+    """
+    # Add search fields to officials written before they existed
+    from app.models.grama_niladhari import grama_niladhari_model
+    grama_niladhari_model.backfill_normalized_fields()
+    
+    # Warm-load the in-memory Grama Niladhari directory and keep it refreshed
+    from app.services.grama_niladhari_directory import grama_niladhari_directory
+    grama_niladhari_directory.start(db.grama_niladhari)
+    
+    # Reference numbers are leased in blocks from the counters collection
+    from app.services.reference_numbers import reference_number_generator
+    reference_number_generator.bind(db.counters)
+    
+    # Write-behind submissions, when enabled, replay the journal and start writing
+    from config.config import Config
+    if Config.SUBMISSION_QUEUE_ENABLED:
+        from app.services.submission_queue import submission_queue
+        submission_queue.start(db.applications)
+
+def reinit_after_fork():
+    """
+    Re-create process-local resources in a forked worker.
+    
+    A MongoClient, its pool and the background threads started with it do
+    not survive fork, and leased reference-number blocks must not be shared
+    between processes. Reconnecting rebuilds all of them through the
+    on-connect hook. If the parent never connected there is nothing to do.
+    The log writer thread is restarted, metrics start from zero since each
+    worker reports its own, and a dummy password hash the parent had not
+    finished is computed again on the worker's own bcrypt pool.
+    """
+    from app.utils import log
+    from app.utils.auth_utils import password_hasher
+    from app.utils.metrics import metrics
+    log.reinit_after_fork()
+    metrics.reset()
+    password_hasher.prepare_dummy_hash()
+    
+    if database_manager.client is None:
+        return
+    
+    database_manager.reconnect()
@@ -1,81 +1,325 @@
 """
 Database connection and initialization module.
 """
-from pymongo import MongoClient
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from pymongo import MongoClient, monitoring
+from pymongo.collection import Collection
 from pymongo.database import Database
 from config.config import Config
+from app.utils.metrics import record_stage
+from app.utils.query_monitor import QueryMonitor
+
+logger = logging.getLogger(__name__)
+
+class _HealthMonitor(monitoring.ServerHeartbeatListener, monitoring.TopologyListener):
+    """
+    Tracks connection health from pymongo's own server monitoring.
+    
+    The driver's monitor threads already heartbeat every server in the
+    background; this listener records what they observe so callers never
+    need to issue their own ping.
+    """
+    
+    def __init__(self, manager: 'DatabaseManager'):
+        self.manager = manager
+    
+    # Server heartbeat events
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        self.manager._record_health(checked=True)
+    
+    def failed(self, event):
+        self.manager._record_health(checked=True)
+    
+    # Topology events
+    def opened(self, event):
+        pass
+    
+    def description_changed(self, event):
+        self.manager._record_health(
+            healthy=event.new_description.has_writable_server()
+        )
+    
+    def closed(self, event):
+        self.manager._record_health(healthy=False)
+
+class _CommandTimer(monitoring.CommandListener):
+    """
+    Records the time spent in each MongoDB command as the 'mongodb' stage.
+    
+    pymongo reports command events on the thread that issued the command,
+    so the time is also attributed to the request that thread is handling.
+    """
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        record_stage('mongodb', event.duration_micros / 1e6)
+    
+    def failed(self, event):
+        record_stage('mongodb', event.duration_micros / 1e6)
+
+# Seconds to wait before retrying a failed on-demand connection
+CONNECT_RETRY_SECONDS = 5
 
 class DatabaseManager:
-    """Manages MongoDB connection and operations."""
+    """
+    Manages MongoDB connection and operations.
+    
+    The connection is opened on first use rather than at import or app
+    creation, so importing the package or building an app never touches
+    the network.
+    """
     
     def __init__(self):
         self.client = None
         self.db = None
+        self._healthy = False
+        self._checked_at = None
+        self._health_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._on_connect: List[Callable[[Database], None]] = []
+        self.index_report = {}
+        self.config_class = Config
     
-    def connect(self) -> Database:
+    def init_app(self, app, config_class=Config):
+        """
+        Set the configuration profile used when the connection opens, without connecting.
+        
+        There is one manager per process, shared by every app created in it;
+        the profile of the most recently created app applies.
+        
+        Args:
+            app (Flask): Flask application
+            config_class: Configuration profile used when the connection opens
+        """
+        self.config_class = config_class
+    
+    def on_connect(self, callback: Callable[[Database], None]):
+        """
+        Register a callback run after every successful (re)connection.
+        
+        Args:
+            callback: Called with the Database instance
+        """
+        if callback not in self._on_connect:
+            self._on_connect.append(callback)
+    
+    def connect(self, config_class=None) -> Database:
         """
         Establish connection to MongoDB.
         
+        Args:
+            config_class: Configuration profile providing the URI and pool settings
+                          (default: the profile given to init_app)
+        
         Returns:
             Database: MongoDB database instance
             
         Raises:
             Exception: If connection fails
         """
+        if config_class is not None:
+            self.config_class = config_class
+        config_class = self.config_class
+        
         try:
             # Validate configuration
-            Config.validate()
+            config_class.validate()
+            
+            listeners = [_HealthMonitor(self), _CommandTimer()]
+            if config_class.MONGODB_QUERY_MONITOR:
+                listeners.append(QueryMonitor(slow_ms=config_class.MONGODB_SLOW_QUERY_MS))
             
-            # Create MongoDB client with timeout
+            # Create MongoDB client with the profile's pool, timeout and concern settings
             self.client = MongoClient(
-                Config.MONGODB_URI, 
-                serverSelectionTimeoutMS=5000
+                config_class.MONGODB_URI,
+                event_listeners=listeners,
+                **config_class.mongo_client_options()
             )
             
             # Get database
-            self.db = self.client[Config.DATABASE_NAME]
+            self.db = self.client[config_class.DATABASE_NAME]
             
             # Test connection
             self.client.admin.command('ping')
+            self._record_health(healthy=True, checked=True)
+            
+            # Open pooled connections up front so the first requests don't pay for them
+            self._prewarm_pool(config_class.MONGODB_PREWARM_CONNECTIONS)
+            
+            if config_class.MONGODB_AUTO_INDEX:
+                self.ensure_indexes()
+            
+            logger.info('Connected to MongoDB', extra={'database': config_class.DATABASE_NAME})
+            
+            for callback in self._on_connect:
+                try:
+                    callback(self.db)
+                except Exception as e:
+                    logger.exception('Post-connect initialization failed')
             
-            print(f"✅ Connected to MongoDB: {Config.DATABASE_NAME}")
             return self.db
             
         except Exception as e:
-            print(f"❌ MongoDB connection failed: {e}")
+            logger.error('MongoDB connection failed', extra={'error': str(e)})
             self.db = None
+            self._record_health(healthy=False, checked=True)
             raise e
     
+    def _prewarm_pool(self, connections: int):
+        """
+        Check out several pooled connections concurrently so they get established.
+        
+        Args:
+            connections (int): Number of connections to open
+        """
+        if connections <= 1:
+            return
+        
+        try:
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(lambda _: self.client.admin.command('ping'), range(connections)))
+        except Exception as e:
+            logger.warning('Connection pool pre-warm incomplete', extra={'error': str(e)})
+    
+    def ensure_indexes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Ensure the indexes in the index registry exist and report any drift.
+        
+        Returns:
+            dict: Missing and extra index names per collection
+        """
+        from app.indexes import ensure_indexes
+        
+        try:
+            self.index_report = ensure_indexes(self.db)
+        except Exception as e:
+            logger.exception('Index management failed')
+            return self.index_report
+        
+        for collection_name, drift in self.index_report.items():
+            if drift['missing']:
+                logger.warning('Missing indexes', extra={'collection': collection_name, 'indexes': drift['missing']})
+            if drift['extra']:
+                logger.info('Unregistered indexes', extra={'collection': collection_name, 'indexes': drift['extra']})
+        
+        return self.index_report
+    
     def get_database(self) -> Database:
         """
-        Get the database instance.
+        Get the database instance, connecting on first use.
+        
+        A failed connection is retried on a later call, at most every
+        CONNECT_RETRY_SECONDS.
         
         Returns:
             Database: MongoDB database instance or None
         """
+        if self.db is None:
+            self._connect_on_demand()
         return self.db
     
+    def collection(self, name: str) -> Optional[Collection]:
+        """
+        Get a collection, connecting to the database on first use.
+        
+        Args:
+            name (str): Collection name
+            
+        Returns:
+            Collection: MongoDB collection, or None if the database is unavailable
+        """
+        db = self.get_database()
+        return None if db is None else db[name]
+    
+    def _connect_on_demand(self):
+        """Connect once across threads, backing off after a failure."""
+        if time.monotonic() < self._retry_at:
+            return
+        
+        with self._connect_lock:
+            if self.db is not None or time.monotonic() < self._retry_at:
+                return
+            
+            try:
+                self.connect()
+            except Exception:
+                self._retry_at = time.monotonic() + CONNECT_RETRY_SECONDS
+    
     def is_connected(self) -> bool:
         """
         Check if database is connected.
         
+        Answers from the health state maintained by the driver's background
+        heartbeats, so no round trip is made.
+        
         Returns:
             bool: True if connected, False otherwise
         """
-        if self.db is None:
-            return False
+        return self.get_database() is not None and self._healthy
+    
+    def health_status(self) -> Dict[str, Any]:
+        """
+        Get the cached database health state.
         
-        try:
-            self.db.command('ping')
-            return True
-        except:
-            return False
+        Returns:
+            dict: Connection status and the age in seconds of the last check
+        """
+        # Checked first: connecting on first use records the initial check
+        connected = self.is_connected()
+        checked_at = self._checked_at
+        age = None if checked_at is None else round(time.monotonic() - checked_at, 3)
+        
+        return {
+            'status': 'connected' if connected else 'disconnected',
+            'checked_seconds_ago': age
+        }
+    
+    def _record_health(self, healthy: Optional[bool] = None, checked: bool = False):
+        """
+        Record an observation from the health monitor.
+        
+        Args:
+            healthy (bool): New health state, or None to keep the current one
+            checked (bool): Whether this observation refreshes the check time
+        """
+        with self._health_lock:
+            if healthy is not None:
+                self._healthy = healthy
+            if checked or healthy is not None:
+                self._checked_at = time.monotonic()
+    
+    def reconnect(self) -> Database:
+        """
+        Replace the client with a new one using the last configuration.
+        
+        Used in forked worker processes: a MongoClient's sockets and monitor
+        threads must not be shared across fork, so the inherited client is
+        dropped (not closed, which would affect the parent) and a fresh one
+        is created.
+        
+        Returns:
+            Database: MongoDB database instance
+        """
+        self.client = None
+        self.db = None
+        return self.connect(self.config_class)
     
     def close_connection(self):
         """Close the database connection."""
         if self.client:
             self.client.close()
-            print("🔌 Database connection closed")
+            self._record_health(healthy=False, checked=True)
+            logger.info('Database connection closed')
 
 # Global database manager instance
 database_manager = DatabaseManager()
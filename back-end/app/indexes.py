@@ -0,0 +1,98 @@
+"""
+Declarative index registry for the application's MongoDB collections.
+"""
+import logging
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+from config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Collection name -> indexes that must exist on it
+INDEXES: Dict[str, List[IndexModel]] = {
+    'users': [
+        # User.find_by_email / login
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+    ],
+    'applications': [
+        # Per-user history, newest first, keyset-paginated on (submitted_date, _id)
+        IndexModel(
+            [('user_id', ASCENDING), ('submitted_date', DESCENDING), ('_id', DESCENDING)],
+            name='user_id_submitted_date_id'
+        ),
+        # Reference number lookups; sparse so documents without one don't collide
+        IndexModel(
+            [('reference_number', ASCENDING)],
+            name='reference_number_unique', unique=True, sparse=True
+        ),
+    ],
+    'idempotency_keys': [
+        # Stored responses expire after the replay window
+        IndexModel(
+            [('created_at', ASCENDING)],
+            name='created_at_ttl', expireAfterSeconds=Config.IDEMPOTENCY_TTL_SECONDS
+        ),
+    ],
+    'rate_limits': [
+        # Shared rate limit buckets are dropped once they have refilled
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0),
+    ],
+    'grama_niladhari': [
+        # Active officials by normalized district, ordered/prefix-matched by division
+        IndexModel(
+            [('status', ASCENDING), ('district_norm', ASCENDING), ('division_norm', ASCENDING)],
+            name='status_district_norm_division_norm'
+        ),
+        # Name word-prefix search (multikey)
+        IndexModel(
+            [('status', ASCENDING), ('name_tokens', ASCENDING)],
+            name='status_name_tokens'
+        ),
+        # Active officials by normalized divisional secretariat
+        IndexModel(
+            [('status', ASCENDING), ('divisional_secretariat_norm', ASCENDING)],
+            name='status_divisional_secretariat_norm'
+        ),
+        # Single-official lookups by division code and employee ID
+        IndexModel([('division_code', ASCENDING)], name='division_code'),
+        IndexModel([('employee_id', ASCENDING)], name='employee_id'),
+    ],
+}
+
+def ensure_indexes(db: Database) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Create every registered index that does not exist yet.
+
+    Index creation is idempotent, so this is safe to run on every start-up.
+
+    Args:
+        db (Database): MongoDB database instance
+
+    Returns:
+        dict: Per collection, the registered indexes that are still missing
+              (e.g. a unique index blocked by duplicate data) and the
+              existing indexes that are not in the registry
+    """
+    report = {}
+
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+
+        for model in models:
+            try:
+                collection.create_indexes([model])
+            except PyMongoError as e:
+                logger.error('Index could not be created',
+                             extra={'collection': collection_name, 'index': model.document['name'], 'error': str(e)})
+
+        existing = set(collection.index_information())
+        expected = {model.document['name'] for model in models}
+
+        report[collection_name] = {
+            'missing': sorted(expected - existing),
+            'extra': sorted(existing - expected - {'_id_'})
+        }
+
+    return report
@@ -0,0 +1,248 @@
+"""
+Grama Niladhari official model for directory lookups.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import logging
+import re
+import unicodedata
+from typing import Optional, Dict, Any, List
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from app.database import database_manager
+
+logger = logging.getLogger(__name__)
+
+# Derived search fields maintained on every write; never returned to clients
+NORMALIZED_FIELDS = ('district_norm', 'divisional_secretariat_norm', 'division_norm', 'name_tokens')
+PUBLIC_PROJECTION = {field: 0 for field in NORMALIZED_FIELDS}
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Normalize text for case-insensitive exact and prefix matching.
+
+    Args:
+        value (str): Raw text
+
+    Returns:
+        str: Unicode-normalized, case-folded text with collapsed whitespace
+    """
+    if not value:
+        return ''
+
+    return ' '.join(unicodedata.normalize('NFKC', value).casefold().split())
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """
+    Split text into normalized word tokens.
+
+    Args:
+        value (str): Raw text
+
+    Returns:
+        list: Normalized tokens, e.g. "Mr. K.A. Silva" -> ['mr', 'k', 'a', 'silva']
+    """
+    return _TOKEN_PATTERN.findall(normalize_text(value))
+
+def normalized_fields(official: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the derived search fields for an official document.
+
+    Args:
+        official (dict): Official document
+
+    Returns:
+        dict: Fields to store alongside the document
+    """
+    return {
+        'district_norm': normalize_text(official.get('district')),
+        'divisional_secretariat_norm': normalize_text(official.get('divisional_secretariat')),
+        'division_norm': normalize_text(official.get('grama_niladhari_division')),
+        'name_tokens': tokenize(official.get('name'))
+    }
+
+def _prefix(value: str) -> Dict[str, Any]:
+    """Build an anchored, escaped prefix match usable as an index range scan."""
+    return {'$regex': '^' + re.escape(value)}
+
+def build_district_query(district: str) -> Dict[str, Any]:
+    """
+    Build the query for active officials in a district (an index seek).
+
+    Args:
+        district (str): District name in any case
+
+    Returns:
+        dict: MongoDB filter
+    """
+    return {'status': 'active', 'district_norm': normalize_text(district)}
+
+def build_search_query(district: Optional[str] = None,
+                       division: Optional[str] = None,
+                       name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the directory search query.
+
+    District is an exact match, division a prefix match and every word of
+    name must prefix-match a word of the official's name.
+
+    Args:
+        district (str): District name
+        division (str): Grama Niladhari division prefix
+        name (str): Name words or word prefixes
+
+    Returns:
+        dict: MongoDB filter
+    """
+    query = {'status': 'active'}
+
+    if district:
+        query['district_norm'] = normalize_text(district)
+    if division:
+        query['division_norm'] = _prefix(normalize_text(division))
+    if name:
+        tokens = tokenize(name)
+        if len(tokens) == 1:
+            query['name_tokens'] = _prefix(tokens[0])
+        elif tokens:
+            query['name_tokens'] = {'$all': [re.compile('^' + re.escape(token)) for token in tokens]}
+
+    return query
+
+DIRECTORY_SORT = [('district_norm', ASCENDING), ('division_norm', ASCENDING)]
+
+def backfill_normalized_fields(collection: Collection) -> int:
+    """
+    Add the derived search fields to officials written without them.
+
+    Args:
+        collection (Collection): grama_niladhari collection
+
+    Returns:
+        int: Number of documents updated
+    """
+    updated = 0
+
+    for official in collection.find({'name_tokens': {'$exists': False}}):
+        collection.update_one({'_id': official['_id']}, {'$set': normalized_fields(official)})
+        updated += 1
+
+    return updated
+
+class GramaNiladhari:
+    """Grama Niladhari model class for directory lookups."""
+
+    def find_by_district(self, district: str) -> List[Dict[str, Any]]:
+        """
+        Find active officials in a district, ordered by division.
+
+        Args:
+            district (str): District name in any case
+
+        Returns:
+            list: Official documents
+        """
+        collection = database_manager.collection('grama_niladhari')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        return list(collection.find(build_district_query(district), PUBLIC_PROJECTION)
+                    .sort('division_norm', ASCENDING))
+
+    def find_by_divisional_secretariat(self, divisional_secretariat: str) -> List[Dict[str, Any]]:
+        """
+        Find active officials in a divisional secretariat, ordered by division.
+
+        Args:
+            divisional_secretariat (str): Divisional secretariat name in any case
+
+        Returns:
+            list: Official documents
+        """
+        collection = database_manager.collection('grama_niladhari')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        query = {'status': 'active', 'divisional_secretariat_norm': normalize_text(divisional_secretariat)}
+        return list(collection.find(query, PUBLIC_PROJECTION).sort(DIRECTORY_SORT))
+
+    def find_by_division_code(self, division_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the active official of a Grama Niladhari division.
+
+        Args:
+            division_code (str): Division code, e.g. 'COL001'
+
+        Returns:
+            dict: Official document or None if not found
+        """
+        collection = database_manager.collection('grama_niladhari')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        return collection.find_one({'status': 'active', 'division_code': division_code}, PUBLIC_PROJECTION)
+
+    def find_by_employee_id(self, employee_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find an active official by employee ID.
+
+        Args:
+            employee_id (str): Employee ID, e.g. 'GN2024001'
+
+        Returns:
+            dict: Official document or None if not found
+        """
+        collection = database_manager.collection('grama_niladhari')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        return collection.find_one({'status': 'active', 'employee_id': employee_id}, PUBLIC_PROJECTION)
+
+    def search(self, district: Optional[str] = None,
+               division: Optional[str] = None,
+               name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search active officials.
+
+        Args:
+            district (str): District name
+            division (str): Division prefix
+            name (str): Name words or word prefixes
+
+        Returns:
+            list: Official documents
+        """
+        collection = database_manager.collection('grama_niladhari')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        return list(collection.find(build_search_query(district, division, name), PUBLIC_PROJECTION)
+                    .sort(DIRECTORY_SORT))
+
+    def backfill_normalized_fields(self) -> int:
+        """
+        Add the derived search fields to officials written without them.
+
+        Returns:
+            int: Number of documents updated
+        """
+        collection = database_manager.collection('grama_niladhari')
+        if collection is None:
+            return 0
+
+        try:
+            updated = backfill_normalized_fields(collection)
+            if updated:
+                logger.info('Normalized search fields added to officials', extra={'count': updated})
+            return updated
+
+        except Exception:
+            logger.exception('Grama Niladhari backfill failed')
+            return 0
+
+# Global Grama Niladhari model instance
+grama_niladhari_model = GramaNiladhari()
@@ -5,25 +5,21 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+import logging
 from datetime import datetime
 from typing import Optional, Dict, Any
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.database import database_manager
-from app.utils.auth_utils import hash_password, check_password
+from app.utils.auth_utils import (
+    hash_password, check_password_or_dummy, rehash_password_if_needed, HasherBusyError
+)
+
+logger = logging.getLogger(__name__)
 
 class User:
     """User model class for handling user operations."""
     
-    def __init__(self):
-        self.collection = None
-        self._ensure_collection()
-    
-    def _ensure_collection(self):
-        """Ensure the users collection is available."""
-        db = database_manager.get_database()
-        if db is not None:
-            self.collection = db.users
-    
     def create_user(self, user_data: Dict[str, Any]) -> Optional[str]:
         """
         Create a new user.
@@ -33,15 +29,16 @@ class User:
             
         Returns:
             str: User ID if successful, None otherwise
+            
+        Raises:
+            DuplicateKeyError: If a user with this email already exists
+                               (enforced by the unique email index)
         """
         try:
-            if self.collection is None:
+            collection = database_manager.collection('users')
+            if collection is None:
                 raise Exception("Database not connected")
             
-            # Check if user already exists
-            if self.find_by_email(user_data['email']):
-                raise Exception("User with this email already exists")
-            
             # Hash password
             hashed_password = hash_password(user_data['password'])
             
@@ -59,13 +56,16 @@ class User:
             }
             
             # Insert user
-            result = self.collection.insert_one(user_doc)
+            result = collection.insert_one(user_doc)
             
-            print(f"✅ User created: {user_data['email']}")
+            logger.info('User created', extra={'user_id': str(result.inserted_id)})
             return str(result.inserted_id)
             
+        except DuplicateKeyError:
+            raise
+            
         except Exception as e:
-            print(f"❌ User creation failed: {e}")
+            logger.exception('User creation failed')
             raise e
     
     def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
@@ -79,13 +79,14 @@ class User:
             dict: User document or None if not found
         """
         try:
-            if self.collection is None:
+            collection = database_manager.collection('users')
+            if collection is None:
                 return None
             
-            return self.collection.find_one({'email': email.lower()})
+            return collection.find_one({'email': email.lower()})
             
-        except Exception as e:
-            print(f"❌ User lookup failed: {e}")
+        except Exception:
+            logger.exception('User lookup by email failed')
             return None
     
     def find_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -99,13 +100,14 @@ class User:
             dict: User document or None if not found
         """
         try:
-            if self.collection is None:
+            collection = database_manager.collection('users')
+            if collection is None:
                 return None
             
-            return self.collection.find_one({'_id': ObjectId(user_id)})
+            return collection.find_one({'_id': ObjectId(user_id)})
             
-        except Exception as e:
-            print(f"❌ User lookup failed: {e}")
+        except Exception:
+            logger.exception('User lookup by ID failed', extra={'user_id': user_id})
             return None
     
     def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
@@ -123,23 +125,49 @@ class User:
             # Find user
             user = self.find_by_email(email)
             
-            if user is None:
+            # Check password (against a dummy hash for unknown emails, so timing is uniform)
+            if not check_password_or_dummy(password, user['password'] if user else None):
                 return None
             
-            # Check password
-            if not check_password(password, user['password']):
-                return None
+            # Upgrade hashes made with a different cost factor
+            user_id, old_hash = user['_id'], user['password']
+            rehash_password_if_needed(
+                password,
+                old_hash,
+                lambda new_hash: self._replace_password_hash(user_id, old_hash, new_hash)
+            )
             
             # Remove password from response
             user.pop('password', None)
             
-            print(f"✅ User authenticated: {email}")
+            logger.debug('User authenticated', extra={'user_id': user_id})
             return user
             
-        except Exception as e:
-            print(f"❌ User authentication failed: {e}")
+        except HasherBusyError:
+            raise
+            
+        except Exception:
+            logger.exception('User authentication failed')
             return None
     
+    def _replace_password_hash(self, user_id: ObjectId, old_hash: bytes, new_hash: bytes):
+        """
+        Store a rehashed password unless the password changed meanwhile.
+        
+        Args:
+            user_id (ObjectId): User ID
+            old_hash (bytes): Hash the new one was derived from
+            new_hash (bytes): Hash at the configured cost
+        """
+        collection = database_manager.collection('users')
+        if collection is None:
+            return
+        
+        collection.update_one(
+            {'_id': user_id, 'password': old_hash},
+            {'$set': {'password': new_hash}}
+        )
+    
     def to_dict(self, user_doc: Dict[str, Any], include_password: bool = False) -> Dict[str, Any]:
         """
         Convert user document to dictionary for API response.
@@ -6,13 +6,53 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from flask import Blueprint, request, jsonify
+from pymongo.errors import DuplicateKeyError
 from app.models.user import user_model
-from app.utils.auth_utils import generate_jwt_token
+from app.utils.auth_utils import generate_jwt_token, service_unavailable, HasherBusyError
+from app.utils.idempotency import idempotent, is_replay
+from app.utils.rate_limit import auth_rate_limiter
+from config.config import Config
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def registration_response(user_doc):
+    """
+    Build the response for a registered user, with a newly issued token.
+    
+    Args:
+        user_doc (dict): User document from database
+        
+    Returns:
+        tuple: Flask response and status code
+    """
+    user_response = user_model.to_dict(user_doc)
+    
+    # Generate JWT token
+    token = generate_jwt_token(user_response['id'])
+    
+    return jsonify({
+        'message': 'User registered successfully',
+        'user': user_response,
+        'token': token
+    }), 201
+
+def save_registration(response):
+    """Keep only the new user's ID for idempotent replays, never the token."""
+    return {'user_id': response.get_json()['user']['id']}
+
+def restore_registration(saved):
+    """Replay a registration with a fresh token for the stored user."""
+    user_doc = user_model.find_by_id(saved['user_id'])
+    if not user_doc:
+        return jsonify({'error': 'User not found'}), 404
+    return registration_response(user_doc)
+
 @auth_bp.route('/register', methods=['POST'])
+# Retries replaying a stored registration do no new work, so they do not count against the limits
+@auth_rate_limiter.limit('register', Config.REGISTER_RATE_LIMIT_IP, Config.REGISTER_RATE_LIMIT_EMAIL,
+                         exempt=is_replay)
+@idempotent(save=save_registration, restore=restore_registration)
 def register():
     """User registration endpoint."""
     try:
@@ -33,7 +73,11 @@ def register():
             'nic': data.get('nic', '').strip()
         }
         
-        # Create user
+        # Refuse known emails before spending bcrypt work on them
+        if user_model.find_by_email(user_data['email']):
+            return jsonify({'error': 'User with this email already exists'}), 409
+        
+        # Create user; the unique email index still rejects a concurrent duplicate
         user_id = user_model.create_user(user_data)
         
         if not user_id:
@@ -41,21 +85,20 @@ def register():
         
         # Get created user (without password)
         created_user = user_model.find_by_id(user_id)
-        user_response = user_model.to_dict(created_user)
         
-        # Generate JWT token
-        token = generate_jwt_token(user_id)
+        return registration_response(created_user)
         
-        return jsonify({
-            'message': 'User registered successfully',
-            'user': user_response,
-            'token': token
-        }), 201
+    except DuplicateKeyError:
+        return jsonify({'error': 'User with this email already exists'}), 409
+        
+    except HasherBusyError as e:
+        return service_unavailable(e)
         
     except Exception as e:
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@auth_rate_limiter.limit('login', Config.LOGIN_RATE_LIMIT_IP, Config.LOGIN_RATE_LIMIT_EMAIL)
 def login():
     """User login endpoint."""
     try:
@@ -87,5 +130,8 @@ def login():
             'token': token
         }), 200
         
+    except HasherBusyError as e:
+        return service_unavailable(e)
+        
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
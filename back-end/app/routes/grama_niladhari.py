@@ -0,0 +1,173 @@
+"""
+Grama Niladhari directory routes for finding local officials.
+Reads are served from the in-memory directory snapshot as pre-rendered
+JSON with a strong ETag, so polling clients get 304 Not Modified. Query
+values are normalized for the render key only, so requests differing only
+in case or spacing share a rendered response, while each response echoes
+the values its caller sent. While the snapshot cannot be loaded,
+the same payloads are built from indexed database queries.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import hashlib
+import logging
+from flask import Blueprint, request, jsonify, current_app
+from app.models.grama_niladhari import grama_niladhari_model, normalize_text
+from app.services.grama_niladhari_directory import grama_niladhari_directory
+from app.utils.auth_utils import jwt_required
+
+logger = logging.getLogger(__name__)
+
+# Create blueprint for the Grama Niladhari directory
+grama_niladhari_bp = Blueprint('grama_niladhari', __name__, url_prefix='/api/grama-niladhari')
+
+def directory_response(key, build_payload, echo=None):
+    """
+    Build a conditional response from a body rendered once per directory snapshot.
+
+    Args:
+        key: Identifies the response within the snapshot
+        build_payload: Callable taking the snapshot (or the model, as a fallback)
+                       and returning the payload, or None if nothing was found
+        echo (dict): Request values returned ahead of the payload as the caller
+                     sent them; they are not part of the rendered body, so
+                     requests that normalize to the same key share it
+
+    Returns:
+        Response: 200 with the body, 304 when If-None-Match matches, or 404
+    """
+    try:
+        snapshot = grama_niladhari_directory.snapshot
+    except Exception as e:
+        logger.warning('Grama Niladhari directory unavailable; querying the database', extra={'error': str(e)})
+        payload = build_payload(grama_niladhari_model)
+        if payload is None:
+            return official_not_found()
+        return jsonify({**echo, **payload} if echo else payload)
+
+    rendered = snapshot.render(key, lambda: build_payload(snapshot), current_app.json.dumpb)
+    if rendered is None:
+        return official_not_found()
+    body, etag = rendered
+
+    if echo:
+        # Splice the echoed values into the rendered object: '{echo...}' + ',' + '...payload}'
+        head = current_app.json.dumpb(echo)
+        body = head[:-1] + b',' + body[1:]
+        etag = f"{etag}-{hashlib.blake2b(head, digest_size=8).hexdigest()}"
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+
+    return response.make_conditional(request)
+
+def official_not_found():
+    """Response for a lookup that matched no active official."""
+    return jsonify({'error': 'Grama Niladhari official not found'}), 404
+
+def officials_payload(officials):
+    """Build the listing part of a payload; the request values are echoed separately."""
+    return {
+        'count': len(officials),
+        'grama_niladhari_officials': officials
+    }
+
+def official_payload(official):
+    """Build the payload for a single official, or None if there is none."""
+    if official is None:
+        return None
+    return {
+        'success': True,
+        'grama_niladhari_official': official
+    }
+
+@grama_niladhari_bp.route('/district/<district>', methods=['GET'])
+@jwt_required
+def get_grama_niladhari_by_district(district):
+    """Get all active Grama Niladhari officials in a district."""
+    try:
+        return directory_response(
+            ('district', normalize_text(district)),
+            lambda source: officials_payload(source.find_by_district(district)),
+            {'success': True, 'district': district}
+        )
+
+    except Exception as e:
+        logger.exception('Grama Niladhari fetch failed', extra={'district': district})
+        return jsonify({'error': f'Failed to fetch officials: {str(e)}'}), 500
+
+@grama_niladhari_bp.route('/divisional-secretariat/<divisional_secretariat>', methods=['GET'])
+@jwt_required
+def get_grama_niladhari_by_divisional_secretariat(divisional_secretariat):
+    """Get all active Grama Niladhari officials in a divisional secretariat."""
+    try:
+        return directory_response(
+            ('divisional_secretariat', normalize_text(divisional_secretariat)),
+            lambda source: officials_payload(source.find_by_divisional_secretariat(divisional_secretariat)),
+            {'success': True, 'divisional_secretariat': divisional_secretariat}
+        )
+
+    except Exception as e:
+        logger.exception('Grama Niladhari fetch failed', extra={'divisional_secretariat': divisional_secretariat})
+        return jsonify({'error': f'Failed to fetch officials: {str(e)}'}), 500
+
+@grama_niladhari_bp.route('/division/<division_code>', methods=['GET'])
+@jwt_required
+def get_grama_niladhari_by_division_code(division_code):
+    """Get the active Grama Niladhari official of a division, by division code."""
+    try:
+        return directory_response(
+            ('division_code', division_code),
+            lambda source: official_payload(source.find_by_division_code(division_code))
+        )
+
+    except Exception as e:
+        logger.exception('Grama Niladhari fetch failed', extra={'division_code': division_code})
+        return jsonify({'error': f'Failed to fetch official: {str(e)}'}), 500
+
+@grama_niladhari_bp.route('/employee/<employee_id>', methods=['GET'])
+@jwt_required
+def get_grama_niladhari_by_employee_id(employee_id):
+    """Get an active Grama Niladhari official by employee ID."""
+    try:
+        return directory_response(
+            ('employee_id', employee_id),
+            lambda source: official_payload(source.find_by_employee_id(employee_id))
+        )
+
+    except Exception as e:
+        logger.exception('Grama Niladhari fetch failed', extra={'employee_id': employee_id})
+        return jsonify({'error': f'Failed to fetch official: {str(e)}'}), 500
+
+@grama_niladhari_bp.route('/search', methods=['GET'])
+@jwt_required
+def search_grama_niladhari():
+    """
+    Search Grama Niladhari officials.
+    Query params: district (exact), division (prefix), name (word prefixes)
+    """
+    try:
+        district = request.args.get('district')
+        division = request.args.get('division')
+        name = request.args.get('name')
+        criteria = [normalize_text(value) or None for value in (district, division, name)]
+
+        return directory_response(
+            ('search', *criteria),
+            lambda source: officials_payload(source.search(district, division, name)),
+            {
+                'success': True,
+                'search_criteria': {
+                    'district': district,
+                    'division': division,
+                    'name': name
+                }
+            }
+        )
+
+    except Exception as e:
+        logger.exception('Grama Niladhari search failed')
+        return jsonify({'error': f'Search failed: {str(e)}'}), 500
@@ -14,24 +14,26 @@ main_bp = Blueprint('main', __name__)
 @main_bp.route('/')
 def hello_world():
     """Hello world endpoint with database status."""
-    db_status = 'connected' if database_manager.is_connected() else 'disconnected'
+    db_health = database_manager.health_status()
     
     return jsonify({
         'message': 'Hello World from GramaConnect Backend!',
         'status': 'success',
-        'database': db_status,
+        'database': db_health['status'],
+        'database_checked_seconds_ago': db_health['checked_seconds_ago'],
         'version': '2.0.0'
     })
 
 @main_bp.route('/health')
 def health_check():
     """Health check endpoint."""
-    db_status = 'connected' if database_manager.is_connected() else 'disconnected'
+    db_health = database_manager.health_status()
     
     return jsonify({
         'message': 'Backend is running!',
         'status': 'healthy',
-        'database': db_status,
+        'database': db_health['status'],
+        'database_checked_seconds_ago': db_health['checked_seconds_ago'],
         'version': '2.0.0'
     })
 
@@ -56,9 +58,6 @@ def test_database():
         # Retrieve the document
         retrieved_doc = test_collection.find_one({'_id': result.inserted_id})
         
-        # Convert ObjectId to string for JSON response
-        retrieved_doc['_id'] = str(retrieved_doc['_id'])
-        
         return jsonify({
             'status': 'success',
             'message': 'Database test successful!',
@@ -5,221 +5,166 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+import logging
 from flask import Blueprint, request, jsonify
-from datetime import datetime
-from app.database import database_manager
+from app.services.applications import (
+    application_service,
+    APPLICATION_FIELDS, APPLICATION_SUMMARY_FIELDS, APPLICATION_SORT_FIELD
+)
 from app.utils.auth_utils import jwt_required, get_current_user
-from bson import ObjectId
+from app.utils.idempotency import idempotent
+from app.utils.pagination import PaginationError, parse_limit, parse_projection
+from app.utils.validation import ValidationError
+from config.config import Config
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint for services
 services_bp = Blueprint('services', __name__)
 
-@services_bp.route('/api/services/marriage-certificate', methods=['POST'])
-@jwt_required
-def apply_marriage_certificate():
-    """Submit marriage certificate application."""
+def submit_application(service_type):
+    """
+    Submit an application for the authenticated user.
+    
+    Args:
+        service_type (str): Service type, e.g. 'marriage_certificate'
+        
+    Returns:
+        Response: 201 with the reference number, or an error
+    """
     try:
+        # Reject oversized bodies from the header, before reading or parsing them
+        if request.content_length is not None and request.content_length > Config.APPLICATION_MAX_BYTES:
+            return jsonify({'error': f'Application must be at most {Config.APPLICATION_MAX_BYTES} bytes'}), 413
+        
         current_user = get_current_user()
         if not current_user:
             return jsonify({'error': 'User not authenticated'}), 401
         
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['groom_name', 'bride_name', 'marriage_date', 'marriage_place', 'groom_nic']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
+        response = application_service.submit(service_type, current_user['_id'], request.get_json(silent=True))
+        return jsonify(response), 201
         
-        if not database_manager.is_connected():
-            return jsonify({'error': 'Database connection failed'}), 500
+    except ValidationError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
         
-        db = database_manager.get_database()
-        
-        # Generate reference number
-        reference_number = f"MC{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # Create application
-        application = {
-            'user_id': ObjectId(current_user['_id']),
-            'service_type': 'marriage_certificate',
-            'status': 'pending',
-            'application_data': {
-                'groom_name': data.get('groom_name'),
-                'bride_name': data.get('bride_name'),
-                'marriage_date': data.get('marriage_date'),
-                'marriage_place': data.get('marriage_place'),
-                'groom_nic': data.get('groom_nic'),
-                'bride_nic': data.get('bride_nic', ''),
-                'witnesses': data.get('witnesses', [])
-            },
-            'submitted_date': datetime.utcnow(),
-            'reference_number': reference_number,
-            'notes': ''
-        }
-        
-        result = db.applications.insert_one(application)
-        application['_id'] = str(result.inserted_id)
-        application['user_id'] = str(application['user_id'])
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Marriage certificate application submitted successfully',
-            'application': application
-        }), 201
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    except Exception:
+        logger.exception('Application submission failed', extra={'service_type': service_type})
         return jsonify({'error': 'Internal server error'}), 500
 
-@services_bp.route('/api/services/applications', methods=['GET'])
+@services_bp.route('/api/services/marriage-certificate', methods=['POST'])
 @jwt_required
-def get_user_applications():
-    """Get all applications for the current user."""
-    try:
-        current_user = get_current_user()
-        if not current_user:
-            return jsonify({'error': 'User not authenticated'}), 401
-        
-        if not database_manager.is_connected():
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        db = database_manager.get_database()
-        
-        applications = list(db.applications.find({
-            'user_id': ObjectId(current_user['_id'])
-        }).sort('submitted_date', -1))
-        
-        # Convert ObjectIds to strings
-        for app in applications:
-            app['_id'] = str(app['_id'])
-            app['user_id'] = str(app['user_id'])
-        
-        return jsonify({
-            'status': 'success',
-            'applications': applications
-        }), 200
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+@idempotent
+def apply_marriage_certificate():
+    """Submit marriage certificate application."""
+    return submit_application('marriage_certificate')
 
 @services_bp.route('/api/services/character-certificate', methods=['POST'])
 @jwt_required
+@idempotent
 def apply_character_certificate():
     """Submit character certificate application."""
+    return submit_application('character_certificate')
+
+@services_bp.route('/api/services/voter-registration', methods=['POST'])
+@jwt_required
+@idempotent
+def apply_voter_registration():
+    """Submit voter registration update application."""
+    return submit_application('voter_registration')
+
+@services_bp.route('/api/services/batch', methods=['POST'])
+@jwt_required
+@idempotent
+def apply_batch():
+    """
+    Submit several applications of any service types in one request.
+    
+    Body: {"applications": [{"service_type": "marriage_certificate", ...}, ...]}
+    
+    Returns one result per application, in request order: 201 if all were
+    created, 207 if only some were, otherwise 400 (or 500 if writes failed).
+    """
     try:
         current_user = get_current_user()
         if not current_user:
             return jsonify({'error': 'User not authenticated'}), 401
         
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['purpose', 'residence_period']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
+        data = request.get_json(silent=True)
+        items = data.get('applications') if isinstance(data, dict) else data
         
-        if not database_manager.is_connected():
-            return jsonify({'error': 'Database connection failed'}), 500
+        results = application_service.submit_batch(current_user['_id'], items, Config.BATCH_MAX_APPLICATIONS)
         
-        db = database_manager.get_database()
-        
-        # Generate reference number
-        reference_number = f"CC{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # Create application
-        application = {
-            'user_id': ObjectId(current_user['_id']),
-            'service_type': 'character_certificate',
-            'status': 'pending',
-            'application_data': {
-                'purpose': data.get('purpose'),
-                'residence_period': data.get('residence_period'),
-                'employment_details': data.get('employment_details', ''),
-                'character_references': data.get('character_references', [])
-            },
-            'submitted_date': datetime.utcnow(),
-            'reference_number': reference_number,
-            'notes': ''
-        }
-        
-        result = db.applications.insert_one(application)
-        application['_id'] = str(result.inserted_id)
-        application['user_id'] = str(application['user_id'])
+        created = sum(1 for result in results if result['status'] == 'created')
+        failed = sum(1 for result in results if result['status'] == 'failed')
+        if created == len(results):
+            status_code = 201
+        elif created:
+            status_code = 207
+        else:
+            status_code = 500 if failed else 400
         
         return jsonify({
-            'status': 'success',
-            'message': 'Character certificate application submitted successfully',
-            'application': application
-        }), 201
+            'message': f'{created} of {len(results)} applications submitted',
+            'created': created,
+            'count': len(results),
+            'results': results
+        }), status_code
         
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    except ValidationError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 400
+        
+    except Exception:
+        logger.exception('Batch submission failed')
         return jsonify({'error': 'Internal server error'}), 500
 
-@services_bp.route('/api/services/voter-registration', methods=['POST'])
+@services_bp.route('/api/services/applications', methods=['GET'])
+@services_bp.route('/api/applications', methods=['GET'])
 @jwt_required
-def apply_voter_registration():
-    """Submit voter registration update application."""
+def get_user_applications():
+    """
+    Get the current user's applications, newest first.
+    
+    Query params:
+        limit: Page size (default and maximum from Config)
+        cursor: next_cursor returned with the previous page
+        fields: Comma-separated fields to return
+        summary: 'true' for reference number, type, status and date only
+    """
     try:
         current_user = get_current_user()
         if not current_user:
             return jsonify({'error': 'User not authenticated'}), 401
         
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['update_type', 'reason_for_change']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
-            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
-        
-        if not database_manager.is_connected():
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        db = database_manager.get_database()
-        
-        # Generate reference number
-        reference_number = f"VR{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # Create application
-        application = {
-            'user_id': ObjectId(current_user['_id']),
-            'service_type': 'voter_registration',
-            'status': 'pending',
-            'application_data': {
-                'update_type': data.get('update_type'),  # 'address_change', 'name_change', 'new_registration'
-                'current_address': data.get('current_address', ''),
-                'new_address': data.get('new_address', ''),
-                'reason_for_change': data.get('reason_for_change'),
-                'supporting_documents': data.get('supporting_documents', [])
-            },
-            'submitted_date': datetime.utcnow(),
-            'reference_number': reference_number,
-            'notes': ''
-        }
-        
-        result = db.applications.insert_one(application)
-        application['_id'] = str(result.inserted_id)
-        application['user_id'] = str(application['user_id'])
+        limit = parse_limit(
+            request.args.get('limit'),
+            Config.APPLICATIONS_PAGE_SIZE,
+            Config.APPLICATIONS_MAX_PAGE_SIZE
+        )
+        projection = parse_projection(
+            request.args.get('fields'),
+            request.args.get('summary', '').lower() == 'true',
+            APPLICATION_FIELDS,
+            APPLICATION_SUMMARY_FIELDS,
+            APPLICATION_SORT_FIELD
+        )
+        applications, next_cursor = application_service.list_for_user(
+            current_user['_id'],
+            limit,
+            request.args.get('cursor'),
+            projection
+        )
         
         return jsonify({
             'status': 'success',
-            'message': 'Voter registration update submitted successfully',
-            'application': application
-        }), 201
+            'message': 'Applications retrieved successfully',
+            'applications': applications,
+            'count': len(applications),
+            'next_cursor': next_cursor
+        }), 200
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
         
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    except Exception:
+        logger.exception('Listing applications failed')
         return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,367 @@
+"""
+Service application submission and listing.
+
+This is the one place that knows how each government service application
+is shaped. Each service's request schema is compiled once at import; fields
+are accepted under the mobile client's camelCase names as well as
+snake_case aliases, normalized into a single stored layout, and listed
+through keyset pagination on (submitted_date, _id).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+from app.database import database_manager
+from app.services.reference_numbers import reference_number_generator, SERVICE_PREFIXES
+from app.services.submission_queue import submission_queue
+from app.utils.pagination import paginate
+from app.utils.validation import Array, Choice, Date, Field, Nic, Phone, String, ValidationError, compile_schema
+
+logger = logging.getLogger(__name__)
+
+# Free-text item in a list field, e.g. a witness or reference
+TEXT_ITEM = String('item', max_length=200)
+
+class ServiceDefinition:
+    """Request schema and response details of one service type."""
+
+    def __init__(self, service_type: str, title: str, fields: List[Field],
+                 processing_time: Optional[str] = None):
+        """
+        Describe a service and compile its request schema.
+
+        Args:
+            service_type (str): Stored service_type, e.g. 'marriage_certificate'
+            title (str): Used in response messages
+            fields (list): application_data fields
+            processing_time (str): Estimated processing time returned to the client
+        """
+        self.service_type = service_type
+        self.title = title
+        self.fields = fields
+        self.processing_time = processing_time
+        self.validate = compile_schema(fields)
+
+SERVICES: Dict[str, ServiceDefinition] = {
+    'marriage_certificate': ServiceDefinition(
+        'marriage_certificate',
+        'Marriage certificate application',
+        [
+            String('applicant_name', 'applicantName', 'groom_name', required=True),
+            String('spouse_name', 'spouseName', 'bride_name', required=True),
+            Date('marriage_date', 'marriageDate', required=True, allow_future=False),
+            String('marriage_place', 'marriagePlace', required=True),
+            Nic('applicant_nic', 'applicantNIC', 'groom_nic', required=True),
+            Nic('spouse_nic', 'spouseNIC', 'bride_nic', required=True),
+            Phone('contact_number', 'contactNumber'),
+            String('address', max_length=500),
+            Array('witnesses', item=TEXT_ITEM, max_items=4)
+        ]
+    ),
+    'character_certificate': ServiceDefinition(
+        'character_certificate',
+        'Character certificate application',
+        [
+            String('applicant_name', 'applicantName', required=True),
+            Nic('nic_number', 'nicNumber', required=True),
+            String('purpose', required=True, max_length=500),
+            String('employment_details', 'employmentDetails', max_length=1000),
+            String('residence_address', 'residenceAddress', max_length=500),
+            Phone('contact_number', 'contactNumber'),
+            String('period_of_residence', 'periodOfResidence', 'residence_period', max_length=100),
+            Array('previous_residences', 'previousResidences', item=String('item', max_length=500)),
+            Array('references', 'character_references', item=TEXT_ITEM, max_items=5)
+        ],
+        processing_time='14-21 working days'
+    ),
+    'voter_registration': ServiceDefinition(
+        'voter_registration',
+        'Voter registration update application',
+        [
+            String('applicant_name', 'applicantName', required=True),
+            Nic('nic_number', 'nicNumber', required=True),
+            Choice('update_type', 'updateType', required=True, choices=(
+                'address_change', 'personal_details', 'polling_division_transfer',
+                'contact_information', 'name_change', 'new_registration'
+            )),
+            String('current_address', 'currentAddress', max_length=500),
+            String('new_address', 'newAddress', max_length=500),
+            String('current_polling_division', 'currentPollingDivision', max_length=100),
+            String('new_polling_division', 'newPollingDivision', max_length=100),
+            Phone('contact_number', 'contactNumber'),
+            String('reason_for_change', 'reasonForChange', max_length=1000),
+            Array('supporting_documents', 'supportingDocuments', item=TEXT_ITEM)
+        ],
+        processing_time='7-14 working days'
+    )
+}
+
+# Top-level application fields clients may request with ?fields=
+APPLICATION_FIELDS = (
+    'user_id', 'service_type', 'status', 'application_data',
+    'submitted_date', 'updated_at', 'reference_number', 'notes'
+)
+
+# Fields returned with ?summary=true
+APPLICATION_SUMMARY_FIELDS = ('service_type', 'status', 'submitted_date', 'reference_number')
+
+# Applications are listed newest first on this field
+APPLICATION_SORT_FIELD = 'submitted_date'
+
+def backfill_legacy_applications(collection: Collection) -> int:
+    """
+    Convert applications written by the old flat layout to the current one.
+
+    The old layout stored a string user_id, created_at instead of
+    submitted_date and the service fields at the top level.
+
+    Args:
+        collection (Collection): applications collection
+
+    Returns:
+        int: Number of documents updated
+    """
+    updated = 0
+
+    for application in collection.find({'submitted_date': {'$exists': False}}):
+        service = SERVICES.get(application.get('service_type'))
+        if service is None:
+            continue
+
+        names = [field.name for field in service.fields]
+        submitted_date = application.get('created_at') or application['_id'].generation_time.replace(tzinfo=None)
+        user_id = application.get('user_id')
+        if isinstance(user_id, str) and ObjectId.is_valid(user_id):
+            user_id = ObjectId(user_id)
+
+        collection.update_one(
+            {'_id': application['_id']},
+            {
+                '$set': {
+                    'user_id': user_id,
+                    'submitted_date': submitted_date,
+                    'application_data': {name: application[name] for name in names if name in application},
+                    'notes': application.get('notes', '')
+                },
+                '$unset': {name: '' for name in names + ['created_at']}
+            }
+        )
+        updated += 1
+
+    return updated
+
+def new_application(service_type: str, user_id: ObjectId, application_data: Dict[str, Any],
+                    reference_number: str, now: datetime) -> Dict[str, Any]:
+    """
+    Build a new, pending application document.
+
+    Args:
+        service_type (str): Key of SERVICES
+        user_id (ObjectId): Applicant's user id
+        application_data (dict): Validated service fields
+        reference_number (str): Issued reference number
+        now (datetime): Submission time
+
+    Returns:
+        dict: Application document with a client-side _id
+    """
+    return {
+        '_id': ObjectId(),
+        'user_id': user_id,
+        'service_type': service_type,
+        'status': 'pending',
+        'application_data': application_data,
+        'submitted_date': now,
+        'updated_at': now,
+        'reference_number': reference_number,
+        'notes': ''
+    }
+
+def resolve_service_type(value: Any) -> Optional[str]:
+    """
+    Map a service type as sent in a batch item to a key of SERVICES.
+
+    Args:
+        value: e.g. 'marriage_certificate' or 'marriage-certificate'
+
+    Returns:
+        str: Service type, or None if unknown
+    """
+    if not isinstance(value, str):
+        return None
+    service_type = value.strip().replace('-', '_')
+    return service_type if service_type in SERVICES else None
+
+class ApplicationService:
+    """Submits and lists service applications."""
+
+    def submit(self, service_type: str, user_id: str, data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate and store an application.
+
+        Args:
+            service_type (str): Key of SERVICES
+            user_id (str): Applicant's user id
+            data (dict): Request JSON
+
+        Returns:
+            dict: Response payload
+
+        Raises:
+            ValidationError: If the request does not match the service's schema
+        """
+        service = SERVICES[service_type]
+        application_data = service.validate(data)
+
+        # A running queue journals the application, so it is accepted through a database outage
+        queued = submission_queue.running
+        collection = None if queued else database_manager.collection('applications')
+        if not queued and collection is None:
+            raise Exception("Database not connected")
+
+        application = new_application(
+            service_type,
+            ObjectId(user_id),
+            application_data,
+            reference_number_generator.next(SERVICE_PREFIXES[service_type]),
+            datetime.utcnow()
+        )
+
+        if queued:
+            # Durable in the local journal now; written to MongoDB in the background
+            submission_queue.submit(application)
+        else:
+            collection.insert_one(application)
+
+        response = {
+            'message': f'{service.title} submitted successfully',
+            'application_id': application['_id'],
+            'reference_number': application['reference_number'],
+            'status': 'pending',
+            'application': application
+        }
+        if service.processing_time:
+            response['estimated_processing_time'] = service.processing_time
+
+        return response
+
+    def submit_batch(self, user_id: str, items: Any, max_items: int) -> List[Dict[str, Any]]:
+        """
+        Validate and store several applications of any service types at once.
+
+        Every item is validated first. Reference numbers for the valid items
+        are allocated in one block per service, and the items are written
+        with a single unordered insert_many, so one failing document does
+        not stop the others.
+
+        Args:
+            user_id (str): Submitting user's id
+            items (list): Application objects, each with a service_type
+            max_items (int): Largest accepted batch
+
+        Returns:
+            list: One result per item, in request order
+
+        Raises:
+            ValidationError: If the batch itself is malformed
+        """
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'applications': 'must be a non-empty list'})
+        if len(items) > max_items:
+            raise ValidationError({'applications': f'must have at most {max_items} items'})
+
+        collection = database_manager.collection('applications')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        results: List[Dict[str, Any]] = []
+        valid: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+
+        for index, item in enumerate(items):
+            results.append({'index': index})
+            service_type = resolve_service_type(item.get('service_type') or item.get('serviceType')) \
+                if isinstance(item, dict) else None
+
+            if service_type is None:
+                results[index].update(status='invalid', errors={
+                    'service_type': f'must be one of: {", ".join(SERVICES)}'
+                })
+                continue
+
+            try:
+                valid.setdefault(service_type, []).append((index, SERVICES[service_type].validate(item)))
+            except ValidationError as e:
+                results[index].update(status='invalid', errors=e.errors)
+
+        owner = ObjectId(user_id)
+        now = datetime.utcnow()
+        applications = []
+        positions = []
+
+        for service_type, entries in valid.items():
+            numbers = reference_number_generator.allocate(SERVICE_PREFIXES[service_type], len(entries))
+            for (index, application_data), reference_number in zip(entries, numbers):
+                applications.append(new_application(service_type, owner, application_data, reference_number, now))
+                positions.append(index)
+
+        failed = {}
+        if applications:
+            try:
+                collection.insert_many(applications, ordered=False)
+            except BulkWriteError as e:
+                failed = {error['index']: error.get('errmsg', 'Write failed') for error in e.details.get('writeErrors', [])}
+                if not failed:
+                    raise
+
+        for position, (index, application) in enumerate(zip(positions, applications)):
+            if position in failed:
+                logger.error('Batch application write failed', extra={'error': failed[position]})
+                results[index].update(status='failed', error='Application could not be saved')
+            else:
+                results[index].update(
+                    status='created',
+                    service_type=application['service_type'],
+                    application_id=application['_id'],
+                    reference_number=application['reference_number']
+                )
+
+        return results
+
+    def list_for_user(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                      projection: Optional[Dict[str, int]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of a user's applications, newest first.
+
+        Args:
+            user_id (str): Applicant's user id
+            limit (int): Page size
+            cursor (str): Cursor returned with the previous page
+            projection (dict): Fields to return, or None for full documents
+
+        Returns:
+            tuple: (applications, cursor for the next page or None)
+
+        Raises:
+            PaginationError: If the cursor is malformed
+        """
+        collection = database_manager.collection('applications')
+        if collection is None:
+            raise Exception("Database not connected")
+
+        return paginate(
+            collection,
+            {'user_id': ObjectId(user_id)},
+            APPLICATION_SORT_FIELD,
+            limit,
+            cursor,
+            projection
+        )
+
+# Global application service instance
+application_service = ApplicationService()
@@ -0,0 +1,380 @@
+"""
+In-memory Grama Niladhari directory.
+
+The grama_niladhari collection is small and almost read-only, so the active
+officials are loaded once into an immutable, versioned snapshot and every
+directory read is answered from memory. A background thread keeps the
+snapshot current from a change stream, falling back to polling on
+updated_at where change streams are unavailable (e.g. a standalone mongod).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import logging
+import hashlib
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Callable, Hashable
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError, OperationFailure
+from config.config import Config
+from app.database import database_manager
+from app.utils.cache import LRUCache
+from app.models.grama_niladhari import NORMALIZED_FIELDS, normalize_text, normalized_fields, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Rendered response bodies kept per snapshot, least recently used evicted first
+MAX_RENDERED_RESPONSES = 512
+
+class DirectorySnapshot:
+    """Immutable view of the active officials with lookup indexes."""
+
+    def __init__(self, officials: Dict[Any, Dict[str, Any]], version: int):
+        """
+        Build a snapshot.
+
+        Args:
+            officials (dict): Active official documents keyed by _id
+            version (int): Snapshot version, increased on every change
+        """
+        self.version = version
+        self._documents = officials
+        self._rendered = LRUCache(MAX_RENDERED_RESPONSES)
+
+        entries = []
+        for official in officials.values():
+            # Stored by every writer and the backfill; computed only for officials written without them
+            if all(field in official for field in NORMALIZED_FIELDS):
+                fields = {field: official[field] for field in NORMALIZED_FIELDS}
+            else:
+                fields = normalized_fields(official)
+            public = {key: value for key, value in official.items() if key not in NORMALIZED_FIELDS}
+            entries.append((fields, public))
+
+        entries.sort(key=lambda entry: (entry[0]['district_norm'], entry[0]['division_norm']))
+        self._entries: Tuple[Tuple[Dict[str, Any], Dict[str, Any]], ...] = tuple(entries)
+
+        self.by_district: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_divisional_secretariat: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_division_code: Dict[str, Dict[str, Any]] = {}
+        self.by_employee_id: Dict[str, Dict[str, Any]] = {}
+
+        for fields, public in self._entries:
+            self.by_district.setdefault(fields['district_norm'], []).append(public)
+            self.by_divisional_secretariat.setdefault(fields['divisional_secretariat_norm'], []).append(public)
+            if public.get('division_code'):
+                self.by_division_code[public['division_code']] = public
+            if public.get('employee_id'):
+                self.by_employee_id[public['employee_id']] = public
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def documents(self) -> Dict[Any, Dict[str, Any]]:
+        """Get a copy of the raw documents keyed by _id, for building the next snapshot."""
+        return dict(self._documents)
+
+    def render(self, key: Hashable, build_payload: Callable[[], Any],
+               dumpb: Callable[[Any], bytes]) -> Optional[Tuple[bytes, str]]:
+        """
+        Get a response body rendered once per snapshot, with its strong ETag.
+
+        Args:
+            key: Identifies the response within this snapshot; build it from
+                 normalized values so that equivalent requests share an entry
+            build_payload: Builds the response payload on a cache miss, or
+                           returns None when there is nothing to render
+            dumpb: JSON serializer returning UTF-8 bytes
+
+        Returns:
+            tuple: (body bytes, ETag derived from the body), or None
+        """
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            payload = build_payload()
+            if payload is None:
+                return None
+
+            body = dumpb(payload)
+            rendered = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+            self._rendered.set(key, rendered)
+
+        return rendered
+
+    def find_by_district(self, district: str) -> List[Dict[str, Any]]:
+        """
+        Get the active officials in a district, ordered by division.
+
+        Args:
+            district (str): District name in any case
+
+        Returns:
+            list: Official documents (shared; do not modify)
+        """
+        return self.by_district.get(normalize_text(district), [])
+
+    def find_by_divisional_secretariat(self, divisional_secretariat: str) -> List[Dict[str, Any]]:
+        """
+        Get the active officials in a divisional secretariat, ordered by district and division.
+
+        Args:
+            divisional_secretariat (str): Divisional secretariat name in any case
+
+        Returns:
+            list: Official documents (shared; do not modify)
+        """
+        return self.by_divisional_secretariat.get(normalize_text(divisional_secretariat), [])
+
+    def find_by_division_code(self, division_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the active official of a Grama Niladhari division.
+
+        Args:
+            division_code (str): Division code, e.g. 'COL001'
+
+        Returns:
+            dict: Official document (shared; do not modify) or None if not found
+        """
+        return self.by_division_code.get(division_code)
+
+    def find_by_employee_id(self, employee_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an active official by employee ID.
+
+        Args:
+            employee_id (str): Employee ID, e.g. 'GN2024001'
+
+        Returns:
+            dict: Official document (shared; do not modify) or None if not found
+        """
+        return self.by_employee_id.get(employee_id)
+
+    def search(self, district: Optional[str] = None,
+               division: Optional[str] = None,
+               name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search the active officials with the same semantics as the database query.
+
+        Args:
+            district (str): District name (exact)
+            division (str): Division prefix
+            name (str): Name words or word prefixes
+
+        Returns:
+            list: Official documents (shared; do not modify)
+        """
+        district_norm = normalize_text(district) if district else None
+        division_norm = normalize_text(division) if division else None
+        name_tokens = tokenize(name) if name else []
+
+        results = []
+        for fields, public in self._entries:
+            if district_norm is not None and fields['district_norm'] != district_norm:
+                continue
+            if division_norm is not None and not fields['division_norm'].startswith(division_norm):
+                continue
+            if name_tokens and not all(
+                any(token.startswith(prefix) for token in fields['name_tokens'])
+                for prefix in name_tokens
+            ):
+                continue
+            results.append(public)
+
+        return results
+
+class GramaNiladhariDirectory:
+    """Keeps a warm snapshot of the Grama Niladhari directory."""
+
+    def __init__(self, poll_interval: float = 30, full_reload_interval: float = 600):
+        """
+        Create the directory.
+
+        Args:
+            poll_interval (float): Seconds between refreshes when polling
+            full_reload_interval (float): Seconds between full reloads when polling,
+                                          which pick up hard deletes
+        """
+        self.poll_interval = poll_interval
+        self.full_reload_interval = full_reload_interval
+        self.collection: Optional[Collection] = None
+        self._snapshot: Optional[DirectorySnapshot] = None
+        self._last_updated_at = None
+        self._last_full_reload = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> DirectorySnapshot:
+        """Get the current snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            if self.collection is None:
+                # Connecting starts the directory through the on-connect hook
+                database_manager.get_database()
+            snapshot = self._snapshot or self.load()
+        return snapshot
+
+    def load(self) -> DirectorySnapshot:
+        """
+        Load every active official into a new snapshot.
+
+        Returns:
+            DirectorySnapshot: The new snapshot
+        """
+        if self.collection is None:
+            raise Exception("Database not connected")
+
+        officials = {official['_id']: official for official in self.collection.find({'status': 'active'})}
+
+        with self._lock:
+            version = self._snapshot.version + 1 if self._snapshot is not None else 1
+            self._snapshot = DirectorySnapshot(officials, version)
+            self._last_updated_at = max(
+                (official['updated_at'] for official in officials.values() if official.get('updated_at')),
+                default=self._last_updated_at
+            )
+            self._last_full_reload = time.monotonic()
+
+        logger.info('Grama Niladhari directory loaded', extra={'officials': len(officials), 'version': version})
+        return self._snapshot
+
+    def apply_changes(self, upserts: Iterable[Dict[str, Any]] = (), deletes: Iterable[Any] = ()) -> bool:
+        """
+        Apply changed and deleted officials to a new snapshot.
+
+        Args:
+            upserts: Changed official documents; inactive ones are removed
+            deletes: _id values of deleted officials
+
+        Returns:
+            bool: True if a new snapshot was published
+        """
+        upserts = list(upserts)
+        deletes = list(deletes)
+        if not upserts and not deletes:
+            return False
+
+        with self._lock:
+            if self._snapshot is None:
+                return False
+
+            officials = self._snapshot.documents()
+            for official in upserts:
+                if official.get('status') == 'active':
+                    officials[official['_id']] = official
+                else:
+                    officials.pop(official['_id'], None)
+
+                if official.get('updated_at') and (
+                        self._last_updated_at is None or official['updated_at'] > self._last_updated_at):
+                    self._last_updated_at = official['updated_at']
+
+            for official_id in deletes:
+                officials.pop(official_id, None)
+
+            self._snapshot = DirectorySnapshot(officials, self._snapshot.version + 1)
+
+        return True
+
+    def start(self, collection: Collection):
+        """
+        Warm-load the directory and start the background refresher.
+
+        Args:
+            collection (Collection): grama_niladhari collection
+        """
+        self.collection = collection
+        self.load()
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='gn-directory-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        """Refresh from a change stream, or poll if change streams are unsupported."""
+        try:
+            self._watch()
+        except OperationFailure as e:
+            logger.info('Change streams unavailable; polling the Grama Niladhari directory', extra={'error': str(e)})
+        except Exception:
+            logger.exception('Grama Niladhari change stream failed')
+
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._poll()
+            except Exception:
+                logger.exception('Grama Niladhari directory refresh failed')
+
+    def _watch(self):
+        """Apply change stream events in batches until stopped."""
+        resume_token = None
+
+        while not self._stop.is_set():
+            try:
+                with self.collection.watch(full_document='updateLookup',
+                                           resume_after=resume_token,
+                                           max_await_time_ms=1000) as stream:
+                    upserts, deletes = [], []
+
+                    # Reload once the stream is open so no change falls in between
+                    if resume_token is None:
+                        self.load()
+
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+
+                        if change is None:
+                            self.apply_changes(upserts, deletes)
+                            upserts, deletes = [], []
+                            resume_token = stream.resume_token
+                            continue
+
+                        if change['operationType'] == 'delete':
+                            deletes.append(change['documentKey']['_id'])
+                        elif change.get('fullDocument') is not None:
+                            upserts.append(change['fullDocument'])
+                        elif change['operationType'] in ('drop', 'rename', 'invalidate'):
+                            resume_token = None
+                            self.load()
+                            break
+
+            except OperationFailure:
+                if resume_token is None:
+                    raise
+                # The resume point is gone; start over from a fresh load
+                resume_token = None
+                self.load()
+            except PyMongoError as e:
+                logger.warning('Grama Niladhari change stream interrupted', extra={'error': str(e)})
+                self._stop.wait(self.poll_interval)
+
+    def _poll(self):
+        """Pick up officials changed since the last refresh, with periodic full reloads."""
+        if time.monotonic() - self._last_full_reload >= self.full_reload_interval:
+            self.load()
+            return
+
+        if self._last_updated_at is None:
+            return
+
+        changed = self.collection.find({'updated_at': {'$gt': self._last_updated_at}})
+        self.apply_changes(changed)
+
+# Global Grama Niladhari directory instance
+grama_niladhari_directory = GramaNiladhariDirectory(
+    poll_interval=Config.GN_DIRECTORY_POLL_SECONDS,
+    full_reload_interval=Config.GN_DIRECTORY_FULL_RELOAD_SECONDS
+)
@@ -0,0 +1,143 @@
+"""
+Reference number generation for service applications.
+
+Reference numbers look like MC-20250816-000123: a service prefix, the UTC
+date and a per-day sequence number. The dashes keep them apart from the
+MC20250816103045 numbers (prefix and timestamp) issued by older versions,
+which have the same digits. Sequence numbers are leased from the
+counters collection in blocks with a single find_one_and_update, so most
+numbers are issued from memory without a database round trip. Blocks left
+unused when a process exits leave gaps, never duplicates.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from config.config import Config
+from app.database import database_manager
+
+# Reference number prefix per service type
+SERVICE_PREFIXES = {
+    'marriage_certificate': 'MC',
+    'character_certificate': 'CC',
+    'voter_registration': 'VR'
+}
+
+def format_reference_number(prefix: str, day: str, sequence: int) -> str:
+    """
+    Format a reference number.
+
+    Args:
+        prefix (str): Service prefix, e.g. 'MC'
+        day (str): UTC date as YYYYMMDD
+        sequence (int): Sequence number within the day
+
+    Returns:
+        str: e.g. 'MC-20250816-000123'
+    """
+    return f"{prefix}-{day}-{sequence:06d}"
+
+class ReferenceNumberGenerator:
+    """Issues unique, human-readable, sortable reference numbers."""
+
+    def __init__(self, block_size: int = 100):
+        """
+        Create the generator.
+
+        Args:
+            block_size (int): Sequence numbers leased per database round trip
+        """
+        self.block_size = block_size
+        self.collection: Optional[Collection] = None
+        self._blocks: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def bind(self, collection: Collection):
+        """
+        Set the counters collection and forget any leased blocks.
+
+        Args:
+            collection (Collection): counters collection
+        """
+        with self._lock:
+            self.collection = collection
+            self._blocks = {}
+
+    def next(self, prefix: str) -> str:
+        """
+        Issue one reference number.
+
+        Args:
+            prefix (str): Service prefix, e.g. 'MC'
+
+        Returns:
+            str: Reference number
+        """
+        return self.allocate(prefix, 1)[0]
+
+    def allocate(self, prefix: str, count: int) -> List[str]:
+        """
+        Issue several reference numbers at once.
+
+        Args:
+            prefix (str): Service prefix, e.g. 'MC'
+            count (int): Number of reference numbers
+
+        Returns:
+            list: Reference numbers in ascending order
+        """
+        if self.collection is None:
+            # Connecting binds the generator through the on-connect hook
+            database_manager.get_database()
+        if self.collection is None:
+            raise Exception("Database not connected")
+
+        day = datetime.utcnow().strftime('%Y%m%d')
+        key = f"{prefix}{day}"
+        numbers = []
+
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                # A new day (or prefix) starts; blocks for earlier days are no longer used
+                self._blocks = {k: v for k, v in self._blocks.items() if k[:len(prefix)] != prefix}
+                block = self._blocks[key] = [1, 0]
+
+            while len(numbers) < count:
+                if block[0] > block[1]:
+                    block[0], block[1] = self._lease(key, max(self.block_size, count - len(numbers)))
+
+                take = min(count - len(numbers), block[1] - block[0] + 1)
+                numbers.extend(range(block[0], block[0] + take))
+                block[0] += take
+
+        return [format_reference_number(prefix, day, number) for number in numbers]
+
+    def _lease(self, key: str, size: int):
+        """
+        Lease a block of sequence numbers from the counters collection.
+
+        Args:
+            key (str): Counter key (prefix and date)
+            size (int): Block size
+
+        Returns:
+            tuple: First and last sequence number of the block
+        """
+        counter = self.collection.find_one_and_update(
+            {'_id': key},
+            {'$inc': {'seq': size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        end = counter['seq']
+        return end - size + 1, end
+
+# Global reference number generator instance
+reference_number_generator = ReferenceNumberGenerator(block_size=Config.REFERENCE_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,424 @@
+"""
+Write-behind queue for service applications.
+
+When enabled, a validated application is appended to a local journal and
+fsynced before the API answers; a background writer then inserts queued
+applications into MongoDB in batches, retrying with backoff while the
+database is slow or unavailable. Applications the database refuses for
+good (e.g. failed validation) are moved to a rejected file instead of
+blocking the queue. Every application carries its _id from
+the start, which makes writes idempotent: after a timeout or a crash the
+same application can be inserted again and is skipped as a duplicate key.
+
+The journal is a directory of segment files, each a sequence of BSON
+documents. A segment is deleted once every application in it has been
+written. On start, segments left behind by a stopped or crashed process
+are replayed. Each process holds an exclusive lock on the segments it owns
+so that several workers can share one journal directory.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import atexit
+import glob
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import bson
+from bson.errors import InvalidBSON, InvalidDocument
+from pymongo.collection import Collection
+from pymongo.errors import (
+    BulkWriteError, ConnectionFailure, OperationFailure, PyMongoError, WriteConcernError
+)
+from config.config import Config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no cross-process locking on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.journal'
+REJECTED_FILE = 'rejected.bson'
+
+# Server error codes that may succeed on retry: elections, shutdowns, network and time limits
+TRANSIENT_ERROR_CODES = frozenset({
+    6,      # HostUnreachable
+    7,      # HostNotFound
+    50,     # MaxTimeMSExpired
+    64,     # WriteConcernFailed
+    89,     # NetworkTimeout
+    91,     # ShutdownInProgress
+    189,    # PrimarySteppedDown
+    262,    # ExceededTimeLimit
+    9001,   # SocketException
+    10107,  # NotWritablePrimary
+    11600,  # InterruptedAtShutdown
+    11602,  # InterruptedDueToReplStateChange
+    13435,  # NotPrimaryNoSecondaryOk
+    13436,  # NotPrimaryOrSecondary
+})
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether a failed write may succeed when retried.
+
+    Args:
+        error (Exception): Error raised by the write
+
+    Returns:
+        bool: True for network, primary-election and write concern failures
+    """
+    if isinstance(error, (ConnectionFailure, WriteConcernError)):
+        return True
+    if isinstance(error, OperationFailure):
+        return error.code in TRANSIENT_ERROR_CODES or error.has_error_label('RetryableWriteError')
+    return False
+
+def _lock(file) -> bool:
+    """Take an exclusive, non-blocking lock on a segment file."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+class _Segment:
+    """A journal file and how many of its applications have been written."""
+
+    def __init__(self, path: str, file):
+        self.path = path
+        self.file = file
+        self.size = 0
+        self.records = 0
+        self.synced = 0
+        self.acked = 0
+
+class SubmissionQueue:
+    """Durable local queue that writes applications to MongoDB in the background."""
+
+    def __init__(self, directory: str, batch_size: int = 100, flush_interval: float = 0.05,
+                 segment_bytes: int = 16 * 1024 * 1024, max_retry_seconds: float = 30):
+        """
+        Create the queue.
+
+        Args:
+            directory (str): Journal directory
+            batch_size (int): Applications written per insert_many
+            flush_interval (float): Seconds the writer waits for more applications
+            segment_bytes (int): Size at which a new journal segment is started
+            max_retry_seconds (float): Longest backoff between failed writes
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.max_retry_seconds = max_retry_seconds
+        self.collection: Optional[Collection] = None
+        self._reset()
+        self._exit_hook = False
+
+    def _reset(self):
+        """Start with empty process-local state."""
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._active: Optional[_Segment] = None
+        self._pending: Deque[Tuple[_Segment, Dict[str, Any]]] = deque()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+
+    @property
+    def running(self) -> bool:
+        """Whether applications submitted now are written behind."""
+        return (self._thread is not None and self._thread.is_alive()
+                and self._pid == os.getpid() and not self._stopping.is_set())
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self, collection: Collection):
+        """
+        Replay leftover journal segments and start the background writer.
+
+        Calling start again (e.g. after a reconnect) only rebinds the collection.
+
+        Args:
+            collection (Collection): applications collection
+        """
+        self.collection = collection
+
+        if self._pid != os.getpid():
+            # Forked child: the writer thread and the parent's segments stay with the parent
+            self._reset()
+        if self.running:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._stopping.clear()
+        recovered = self._recover()
+
+        self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+        self._thread.start()
+
+        if not self._exit_hook:
+            atexit.register(self.stop)
+            self._exit_hook = True
+
+        logger.info('Submission queue started', extra={'recovered': recovered})
+
+    def stop(self, timeout: float = 10):
+        """
+        Stop the writer after it has flushed what it can within the timeout.
+
+        Applications not written by then stay in the journal for the next start.
+        """
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout)
+        self._thread = None
+
+        if self._pending:
+            logger.warning('Submission queue stopped with applications left in the journal',
+                           extra={'pending': len(self._pending)})
+
+    def submit(self, document: Dict[str, Any]):
+        """
+        Journal an application durably and queue it for writing.
+
+        Returns once the application is on disk; the database write happens later.
+
+        Args:
+            document (dict): Application document with its _id set
+        """
+        data = bson.encode(document)
+
+        retired = None
+
+        with self._lock:
+            segment = self._active
+            if segment is None or segment.size >= self.segment_bytes:
+                retired = segment
+                segment = self._rotate()
+
+            segment.file.write(data)
+            segment.file.flush()
+            segment.size += len(data)
+            segment.records += 1
+            ticket = segment.records
+            self._pending.append((segment, document))
+
+        if retired is not None:
+            # Deleted here if every application in it was already written
+            self._finish(retired)
+
+        self._sync(segment, ticket)
+        self._wakeup.set()
+
+    def _rotate(self) -> _Segment:
+        """Start a new active segment (caller holds the lock)."""
+        name = f"{time.time_ns()}-{os.getpid()}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, name)
+        file = open(path, 'ab')
+        _lock(file)
+
+        # Make the new file's directory entry durable too
+        if hasattr(os, 'O_DIRECTORY'):
+            directory = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+        self._active = _Segment(path, file)
+        return self._active
+
+    def _sync(self, segment: _Segment, ticket: int):
+        """
+        Make a segment durable up to a record (group commit).
+
+        One fsync covers every record appended before it started, so
+        concurrent submissions share it instead of queueing one each.
+        """
+        with self._sync_lock:
+            if segment.synced >= ticket or segment.file is None:
+                return
+
+            with self._lock:
+                target = segment.records
+            os.fsync(segment.file.fileno())
+            segment.synced = target
+
+    def _recover(self) -> int:
+        """
+        Queue the applications in segments no live process owns.
+
+        Returns:
+            int: Number of applications queued
+        """
+        recovered = 0
+
+        for path in sorted(glob.glob(os.path.join(self.directory, '*' + SEGMENT_SUFFIX))):
+            try:
+                file = open(path, 'rb+')
+            except FileNotFoundError:
+                continue
+
+            if not _lock(file):
+                file.close()
+                continue
+
+            segment = _Segment(path, file)
+
+            try:
+                for document in bson.decode_file_iter(file):
+                    segment.records += 1
+                    self._pending.append((segment, document))
+            except InvalidBSON:
+                # A torn final record was never acknowledged to a client
+                logger.warning('Ignoring incomplete journal record', extra={'segment': os.path.basename(path)})
+
+            segment.synced = segment.records
+            recovered += segment.records
+            self._finish(segment)
+
+        return recovered
+
+    def _run(self):
+        """Write queued applications in batches until stopped."""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    break
+                unwritten = self._write(batch)
+                if unwritten:
+                    with self._lock:
+                        self._pending.extendleft(reversed(unwritten))
+                    return
+
+            if self._stopping.is_set():
+                return
+
+    def _write(self, batch: List[Tuple[_Segment, Dict[str, Any]]]) -> List[Tuple[_Segment, Dict[str, Any]]]:
+        """
+        Insert a batch, retrying transient failures until every application is written or rejected.
+
+        Returns:
+            list: Applications left unwritten because the queue was stopped
+        """
+        delay = 0.1
+
+        while batch:
+            try:
+                self.collection.insert_many([document for _, document in batch], ordered=False)
+                done, batch = batch, []
+
+            except BulkWriteError as e:
+                retry = set()
+                for error in e.details.get('writeErrors', []):
+                    segment, document = batch[error['index']]
+                    code = error.get('code')
+                    if code in TRANSIENT_ERROR_CODES:
+                        retry.add(error['index'])
+                    elif code != 11000 or not self._is_duplicate_id(error):
+                        # Failed validation, or a unique key other than _id collides; retrying cannot succeed
+                        self._reject(document, error.get('errmsg', f'write error {code}'))
+
+                if e.details.get('writeConcernErrors'):
+                    # Inserted but not acknowledged as requested; a retry is skipped as a duplicate
+                    retry.update(range(len(batch)))
+                    retry.difference_update(error['index'] for error in e.details.get('writeErrors', [])
+                                            if error.get('code') not in TRANSIENT_ERROR_CODES)
+
+                done = [entry for index, entry in enumerate(batch) if index not in retry]
+                batch = [entry for index, entry in enumerate(batch) if index in retry]
+
+            except (PyMongoError, InvalidDocument) as e:
+                if not is_transient(e):
+                    if len(batch) > 1:
+                        # Write one at a time to find the application the error belongs to
+                        for index, entry in enumerate(batch):
+                            unwritten = self._write([entry])
+                            if unwritten:
+                                return unwritten + batch[index + 1:]
+                        return []
+
+                    self._reject(batch[0][1], str(e))
+                    done, batch = batch, []
+                else:
+                    logger.error('Submission queue write failed', extra={'retry_seconds': delay, 'error': str(e)})
+                    done = []
+
+            for segment, _ in done:
+                segment.acked += 1
+                self._finish(segment)
+
+            if batch:
+                if self._stopping.is_set() or self._stopping.wait(delay):
+                    return batch
+                delay = min(delay * 2, self.max_retry_seconds)
+
+        return []
+
+    @staticmethod
+    def _is_duplicate_id(error: Dict[str, Any]) -> bool:
+        """Whether a duplicate key error means the application was already written."""
+        key = error.get('keyPattern') or error.get('keyValue')
+        if key:
+            return '_id' in key
+        return 'index: _id_ ' in error.get('errmsg', '')
+
+    def _finish(self, segment: _Segment):
+        """Delete a retired segment, or empty the active one, once all its applications are written."""
+        with self._sync_lock:
+            with self._lock:
+                if segment.file is None or segment.acked < segment.records:
+                    return
+
+                if segment is self._active:
+                    if segment.records and not self._pending:
+                        # Idle: start the active segment over so the journal does not grow
+                        segment.file.truncate(0)
+                        segment.size = segment.records = segment.synced = segment.acked = 0
+                    return
+
+            try:
+                os.remove(segment.path)
+            except FileNotFoundError:
+                pass
+            segment.file.close()
+            segment.file = None
+
+    def _reject(self, document: Dict[str, Any], error: str):
+        """Keep an application that can never be inserted, for manual follow-up."""
+        logger.error('Submission queue rejected application', extra={'application_id': document.get('_id'), 'error': error})
+        with open(os.path.join(self.directory, REJECTED_FILE), 'ab') as file:
+            file.write(bson.encode(document))
+            file.flush()
+            os.fsync(file.fileno())
+
+# Global submission queue instance
+submission_queue = SubmissionQueue(
+    Config.SUBMISSION_JOURNAL_DIR,
+    batch_size=Config.SUBMISSION_BATCH_SIZE,
+    flush_interval=Config.SUBMISSION_FLUSH_INTERVAL_MS / 1000,
+    segment_bytes=Config.SUBMISSION_SEGMENT_BYTES,
+    max_retry_seconds=Config.SUBMISSION_MAX_RETRY_SECONDS
+)
@@ -1,30 +1,56 @@
 """
 Authentication utility functions.
 """
+import logging
 import jwt
-import bcrypt
+import time
 from datetime import datetime, timedelta
 from functools import wraps
+from typing import Callable, Optional
 from flask import request, jsonify, g
 from config.config import Config
 from app.database import database_manager
+from app.utils.cache import TTLCache
+from app.utils.metrics import stage
+from app.utils.password_hasher import PasswordHasher, HasherBusyError
 from bson import ObjectId
 
+logger = logging.getLogger(__name__)
+
+# bcrypt runs on a bounded pool so login bursts can't monopolise request threads
+password_hasher = PasswordHasher(
+    rounds=Config.BCRYPT_ROUNDS,
+    workers=Config.BCRYPT_WORKERS,
+    max_pending=Config.BCRYPT_MAX_PENDING,
+    queue_timeout=Config.BCRYPT_QUEUE_TIMEOUT_SECONDS,
+    retry_after=Config.BCRYPT_RETRY_AFTER_SECONDS
+)
+
+# Verified token -> decoded claims
+token_cache = TTLCache(Config.TOKEN_CACHE_SIZE, Config.TOKEN_CACHE_TTL_SECONDS)
+
+# User ID -> user document without the password hash; no endpoint changes users, so entries just expire
+user_cache = TTLCache(Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL_SECONDS)
+
 def hash_password(password: str) -> bytes:
     """
-    Hash a password using bcrypt.
+    Hash a password using bcrypt on the password hashing pool.
     
     Args:
         password (str): Plain text password
         
     Returns:
         bytes: Hashed password
+        
+    Raises:
+        HasherBusyError: If the hashing queue is saturated
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    with stage('bcrypt'):
+        return password_hasher.hash(password)
 
 def check_password(password: str, hashed: bytes) -> bool:
     """
-    Check if password matches hash.
+    Check if password matches hash on the password hashing pool.
     
     Args:
         password (str): Plain text password
@@ -32,8 +58,80 @@ def check_password(password: str, hashed: bytes) -> bool:
         
     Returns:
         bool: True if password matches, False otherwise
+        
+    Raises:
+        HasherBusyError: If the hashing queue is saturated
     """
-    return bcrypt.checkpw(password.encode('utf-8'), hashed)
+    with stage('bcrypt'):
+        return password_hasher.check(password, hashed)
+
+def check_password_or_dummy(password: str, hashed: Optional[bytes]) -> bool:
+    """
+    Check a password, verifying against a dummy hash when there is no user.
+    
+    Unknown emails then cost the same bcrypt work as known ones, which keeps
+    login latency uniform and does not reveal whether an account exists.
+    
+    Args:
+        password (str): Plain text password
+        hashed (bytes): Stored hash, or None if the user was not found
+        
+    Returns:
+        bool: True only if hashed is given and the password matches
+    """
+    if hashed is None:
+        # Precomputed at start-up; waits on the pool only if that is still running
+        with stage('bcrypt'):
+            dummy_hash = password_hasher.dummy_hash
+        check_password(password, dummy_hash)
+        return False
+    
+    return check_password(password, hashed)
+
+def rehash_password_if_needed(password: str, hashed: bytes, save: Callable[[bytes], None]):
+    """
+    Upgrade a hash made with a different cost factor, in the background.
+    
+    Call after a successful login. The new hash is computed on the hashing
+    pool and passed to save; if the pool is busy the upgrade is skipped and
+    retried on a later login.
+    
+    Args:
+        password (str): Verified plain text password
+        hashed (bytes): Stored hash
+        save: Callback storing the new hash
+    """
+    if not password_hasher.needs_rehash(hashed):
+        return
+    
+    try:
+        future = password_hasher.submit_hash(password)
+    except HasherBusyError:
+        return
+    
+    def on_done(done):
+        try:
+            save(done.result())
+        except Exception:
+            logger.exception('Password rehash failed')
+    
+    future.add_done_callback(on_done)
+
+def service_unavailable(error: HasherBusyError):
+    """
+    Build the 503 response for a saturated password hashing queue.
+    
+    Args:
+        error (HasherBusyError): The raised error
+        
+    Returns:
+        tuple: Flask response, status code and headers
+    """
+    return (
+        jsonify({'error': 'Server is busy, please try again shortly'}),
+        503,
+        {'Retry-After': str(error.retry_after)}
+    )
 
 def generate_jwt_token(user_id: str) -> str:
     """
@@ -52,29 +150,44 @@ def generate_jwt_token(user_id: str) -> str:
             'iat': datetime.utcnow()
         }
         
-        return jwt.encode(payload, Config.SECRET_KEY, algorithm='HS256')
-    except Exception as e:
-        print(f"❌ Token generation failed: {e}")
+        with stage('jwt'):
+            return jwt.encode(payload, Config.SECRET_KEY, algorithm='HS256')
+    except Exception:
+        logger.exception('Token generation failed', extra={'user_id': str(user_id)})
         return None
 
 def decode_jwt_token(token: str) -> dict:
     """
     Decode and validate JWT token.
     
+    Verified payloads are cached until the token expires (or the cache TTL
+    elapses), so repeated requests with the same token skip the signature check.
+    
     Args:
         token (str): JWT token
         
     Returns:
         dict: Decoded payload or None if invalid
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
-        payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'])
+        with stage('jwt'):
+            payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'])
+        
+        if 'exp' in payload:
+            token_cache.set(token, payload, ttl=payload['exp'] - time.time())
+        else:
+            token_cache.set(token, payload)
+        
         return payload
     except jwt.ExpiredSignatureError:
-        print("❌ Token expired")
+        logger.info('Token expired')
         return None
     except jwt.InvalidTokenError:
-        print("❌ Invalid token")
+        logger.info('Invalid token')
         return None
 
 def jwt_required(f):
@@ -114,28 +227,37 @@ def jwt_required(f):
 
 def get_current_user():
     """
-    Get the current authenticated user from database.
+    Get the current authenticated user.
+    
+    Users are served from the per-process user cache when possible; the
+    password hash is never loaded.
     
     Returns:
-        dict: User document from database or None if not found
+        dict: User document (without password) or None if not found
     """
     try:
         if not hasattr(g, 'current_user_id'):
             return None
         
+        user_id = g.current_user_id
+        user = user_cache.get(user_id)
+        if user is not None:
+            return dict(user)
+        
         if not database_manager.is_connected():
-            print("❌ Database not connected")
+            logger.error('Database not connected')
             return None
         
-        db = database_manager.get_database()
-        user = db.users.find_one({'_id': ObjectId(g.current_user_id)})
+        user = database_manager.collection('users').find_one({'_id': ObjectId(user_id)}, {'password': 0})
         
         if user:
             # Convert ObjectId to string for JSON serialization
             user['_id'] = str(user['_id'])
+            user_cache.set(user_id, user)
+            return dict(user)
         
         return user
         
-    except Exception as e:
-        print(f"❌ Error getting current user: {e}")
+    except Exception:
+        logger.exception('Error getting current user')
         return None
@@ -0,0 +1,147 @@
+"""
+In-process caching utilities.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+    """Bounded, thread-safe cache evicting the least recently used entries."""
+
+    def __init__(self, maxsize: int):
+        """
+        Create a cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept before evicting the least recently used
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Create a cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept before evicting the least recently used
+            ttl (float): Default time-to-live of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl (float): Time-to-live in seconds, capped at the cache default
+        """
+        if self.maxsize <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove a key from the cache.
+
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing
+
+        Returns:
+            The removed value or default
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
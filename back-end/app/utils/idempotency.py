@@ -0,0 +1,291 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+The first response to a request carrying an Idempotency-Key header is
+stored in the idempotency_keys collection (expired by a TTL index) and
+kept in a per-process cache; retries with the same key get that response
+back instead of repeating the work. Duplicates that arrive while the first
+request is still running wait for it within a process, and are told to
+retry across processes, so they never run concurrently.
+"""
+import logging
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+from flask import current_app, g, jsonify, request
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from config.config import Config
+from app.database import database_manager
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# Responses that must not be replayed: the client should be able to retry them for real
+UNSTORED_STATUS_CODES = frozenset({401, 403, 408, 409, 429})
+
+class IdempotencyStore:
+    """Stores first responses per idempotency key and coalesces duplicates."""
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int, cache_size: int):
+        """
+        Create the store.
+
+        Args:
+            ttl_seconds (int): How long responses are replayed
+            lock_seconds (int): How long a claimed key stays locked without a response
+            cache_size (int): Responses cached in this process
+        """
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.cache = TTLCache(cache_size, ttl_seconds)
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def run(self, scope: str, fingerprint: str, handler: Callable[[], Any],
+            save: Optional[Callable] = None, restore: Optional[Callable] = None):
+        """
+        Run a request once per key and replay its response for duplicates.
+
+        Args:
+            scope (str): Key scoped to the caller and endpoint
+            fingerprint (str): Hash of the request body
+            handler: Produces the response on first use
+            save: Reduces a successful response to the data stored in place of its body
+            restore: Rebuilds the response from the data kept by save
+
+        Returns:
+            Response: The original or replayed response
+        """
+        for _ in range(2):
+            stored = self.cache.get(scope)
+            if stored is not None:
+                return self._replay(stored, fingerprint, restore)
+
+            with self._lock:
+                event = self._inflight.get(scope)
+                owner = event is None
+                if owner:
+                    event = self._inflight[scope] = threading.Event()
+
+            if owner:
+                try:
+                    return self._execute(scope, fingerprint, handler, save, restore)
+                finally:
+                    with self._lock:
+                        self._inflight.pop(scope, None)
+                    event.set()
+
+            # Coalesce with the request already running in this process
+            if not event.wait(self.lock_seconds):
+                break
+
+        return in_progress_response()
+
+    def _execute(self, scope: str, fingerprint: str, handler: Callable[[], Any],
+                 save: Optional[Callable], restore: Optional[Callable]):
+        """Claim the key, run the handler and store its response."""
+        collection = database_manager.collection('idempotency_keys')
+        now = datetime.utcnow()
+
+        if collection is not None:
+            try:
+                existing = self._claim(collection, scope, fingerprint, now)
+            except PyMongoError as e:
+                # Still coalesced within this process; the handler runs as if no key was sent
+                logger.error('Idempotency key claim failed', extra={'error': str(e)})
+                collection = existing = None
+            if existing is not None:
+                if existing.get('status') != 'completed':
+                    return in_progress_response()
+                stored = self._stored(existing)
+                self.cache.set(scope, stored)
+                return self._replay(stored, fingerprint, restore)
+
+        try:
+            response = current_app.make_response(handler())
+        except Exception:
+            self._release(collection, scope)
+            raise
+
+        if response.status_code >= 500 or response.status_code in UNSTORED_STATUS_CODES:
+            self._release(collection, scope)
+            return response
+
+        stored = {'fingerprint': fingerprint, 'status_code': response.status_code}
+        if save is not None and response.status_code < 300:
+            stored['saved'] = save(response)
+        else:
+            stored['body'] = response.get_data()
+            stored['content_type'] = response.content_type
+        self.cache.set(scope, stored)
+
+        if collection is not None:
+            try:
+                collection.update_one({'_id': scope}, {'$set': {'status': 'completed', **stored}})
+            except PyMongoError as e:
+                logger.error('Failed to store idempotent response', extra={'error': str(e)})
+
+        return response
+
+    def has_response(self, scope: str, fingerprint: str) -> bool:
+        """
+        Check whether a response for the same request is stored, so a duplicate will be replayed.
+
+        A response found in the database is cached for the replay that follows.
+
+        Args:
+            scope (str): Key scoped to the caller and endpoint
+            fingerprint (str): Hash of the request body
+
+        Returns:
+            bool: True if the stored response matches this request
+        """
+        stored = self.cache.get(scope)
+        if stored is None:
+            collection = database_manager.collection('idempotency_keys')
+            if collection is None:
+                return False
+            try:
+                record = collection.find_one({'_id': scope, 'status': 'completed'})
+            except PyMongoError as e:
+                logger.error('Idempotency key lookup failed', extra={'error': str(e)})
+                return False
+            if record is None:
+                return False
+            stored = self._stored(record)
+            self.cache.set(scope, stored)
+
+        return stored['fingerprint'] == fingerprint
+
+    def _claim(self, collection, scope: str, fingerprint: str, now: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Claim a key for this request.
+
+        Returns:
+            dict: The existing record if another request holds or completed the key, else None
+        """
+        try:
+            collection.insert_one({
+                '_id': scope,
+                'status': 'pending',
+                'fingerprint': fingerprint,
+                'created_at': now
+            })
+            return None
+        except DuplicateKeyError:
+            pass
+
+        # Take over a claim whose request died without storing a response
+        taken = collection.find_one_and_update(
+            {'_id': scope, 'status': 'pending', 'created_at': {'$lt': now - timedelta(seconds=self.lock_seconds)}},
+            {'$set': {'fingerprint': fingerprint, 'created_at': now}}
+        )
+        if taken is not None:
+            return None
+
+        return collection.find_one({'_id': scope}) or {'status': 'pending'}
+
+    def _release(self, collection, scope: str):
+        """Drop an unfinished claim so the request can be retried."""
+        if collection is None:
+            return
+        try:
+            collection.delete_one({'_id': scope, 'status': 'pending'})
+        except PyMongoError as e:
+            logger.error('Failed to release idempotency key', extra={'error': str(e)})
+
+    @staticmethod
+    def _stored(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the stored response from a database record."""
+        stored = {'fingerprint': record.get('fingerprint'), 'status_code': record['status_code']}
+        if 'saved' in record:
+            stored['saved'] = record['saved']
+        else:
+            stored['body'] = bytes(record['body'])
+            stored['content_type'] = record.get('content_type')
+        return stored
+
+    @staticmethod
+    def _replay(stored: Dict[str, Any], fingerprint: str, restore: Optional[Callable]):
+        """Build the response for a duplicate request."""
+        if stored['fingerprint'] != fingerprint:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'}), 422
+
+        if 'saved' in stored and restore is not None:
+            response = current_app.make_response(restore(stored['saved']))
+        else:
+            response = current_app.response_class(stored.get('body', b''), status=stored['status_code'],
+                                                  content_type=stored.get('content_type'))
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+def in_progress_response():
+    """Response for a duplicate of a request that has not finished yet."""
+    return jsonify({'error': f'A request with this {IDEMPOTENCY_HEADER} is still being processed'}), 409, \
+        {'Retry-After': '1'}
+
+def request_scope(key: str) -> str:
+    """Scope an idempotency key to the current caller and endpoint."""
+    return f"{getattr(g, 'current_user_id', 'anonymous')}:{request.path}:{key}"
+
+def request_fingerprint() -> str:
+    """Hash of the current request body."""
+    return hashlib.sha256(request.get_data()).hexdigest()
+
+def is_replay() -> bool:
+    """
+    Whether the current request repeats one whose response is stored and will be replayed.
+
+    Lets rate limits exempt retries that do no new work.
+
+    Returns:
+        bool: True for a valid Idempotency-Key with a stored, matching response
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return False
+    return idempotency_store.has_response(request_scope(key), request_fingerprint())
+
+def idempotent(f: Optional[Callable] = None, *, save: Optional[Callable] = None,
+               restore: Optional[Callable] = None):
+    """
+    Decorator honouring the Idempotency-Key header on a POST endpoint.
+
+    Keys are scoped to the authenticated user (apply after @jwt_required) and
+    the endpoint path. Requests without the header run normally.
+
+    Responses carrying secrets, such as bearer tokens, must not be stored as
+    they are: pass save to keep only non-secret data from a successful
+    response, and restore to build the replayed response from it.
+
+    Args:
+        save: Maps a successful response to the data stored for it
+        restore: Maps the stored data back to a response
+    """
+    if f is None:
+        return lambda view: idempotent(view, save=save, restore=restore)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return f(*args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        return idempotency_store.run(request_scope(key), request_fingerprint(), lambda: f(*args, **kwargs), save, restore)
+
+    return decorated_function
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore(
+    Config.IDEMPOTENCY_TTL_SECONDS,
+    Config.IDEMPOTENCY_LOCK_SECONDS,
+    Config.IDEMPOTENCY_CACHE_SIZE
+)
@@ -0,0 +1,118 @@
+"""
+JSON provider that encodes MongoDB documents directly.
+
+ObjectId, datetime and bytes values are encoded by the provider itself, so
+views can return documents straight from the database without converting
+each field first. orjson is used when it is installed; otherwise the
+standard library encoder is used with the same output.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+def encode_default(value: Any) -> Any:
+    """
+    Encode values the JSON encoder does not handle itself.
+
+    Args:
+        value: Value to encode
+
+    Returns:
+        A JSON-serializable replacement
+
+    Raises:
+        TypeError: If the value cannot be encoded
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode('ascii')
+    if isinstance(value, Decimal128):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, with a standard library fallback."""
+
+    # Keep documents in field order; sorting keys costs time on large listings
+    sort_keys = False
+
+    def _orjson_options(self, kwargs) -> int:
+        """Translate the json.dumps arguments Flask passes into orjson options."""
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumpb(self, obj: Any, **kwargs: Any) -> bytes:
+        """
+        Serialize data as UTF-8 encoded JSON bytes.
+
+        Args:
+            obj: Data to serialize
+
+        Returns:
+            bytes: JSON document
+        """
+        if orjson is not None:
+            return orjson.dumps(obj, default=encode_default, option=self._orjson_options(kwargs))
+        return self.dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON.
+
+        Args:
+            obj: Data to serialize
+
+        Returns:
+            str: JSON document
+        """
+        if orjson is not None:
+            return self.dumpb(obj, **kwargs).decode('utf-8')
+
+        if not kwargs.get('indent'):
+            kwargs.setdefault('separators', (',', ':'))
+        kwargs.setdefault('default', encode_default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Deserialize data as JSON.
+
+        Args:
+            s: Text or UTF-8 bytes
+
+        Returns:
+            Decoded data
+        """
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Serialize the given arguments as JSON and return a response with the application/json mimetype.
+
+        Compact output is used unless the app is in debug mode, as in Flask's default provider.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        return self._app.response_class(self.dumpb(obj, indent=2 if indent else None) + b'\n',
+                                        mimetype=self.mimetype)
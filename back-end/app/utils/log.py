@@ -0,0 +1,208 @@
+"""
+Structured, non-blocking logging.
+
+Modules log through the standard library (logging.getLogger(__name__))
+and pass structured fields with extra={...}. configure_logging() routes
+every record through a bounded queue to a background thread that writes
+one JSON object per line to stdout, so request threads never wait on
+stdout. If the queue is full, records are dropped and counted rather than
+blocking the caller.
+
+Levels can be set per module (LOG_LEVELS), and high-frequency loggers can
+be sampled (LOG_SAMPLE_RATES). A sampled record carries its sample_rate
+so that counts can be scaled back up.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+from config.config import Config
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+def parse_settings(value: str, convert=str) -> Dict[str, Any]:
+    """
+    Parse 'name=value,name=value' settings.
+
+    Args:
+        value (str): Comma-separated assignments
+        convert: Applied to each value
+
+    Returns:
+        dict: Values by name
+    """
+    settings = {}
+    for item in (value or '').split(','):
+        name, _, setting = item.partition('=')
+        if name.strip() and setting.strip():
+            settings[name.strip()] = convert(setting.strip())
+    return settings
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object with its extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records below ERROR from selected loggers."""
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Create the filter.
+
+        Args:
+            rates (dict): Fraction of records kept per logger name (or prefix)
+        """
+        super().__init__()
+        self.rates = rates
+        self._by_logger: Dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        """The rate of the longest configured prefix of a logger name."""
+        rate = self._by_logger.get(name, False)
+        if rate is False:
+            rate = None
+            for prefix, value in sorted(self.rates.items(), key=lambda item: len(item[0])):
+                if name == prefix or name.startswith(prefix + '.'):
+                    rate = value
+            self._by_logger[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        if rate is None or rate >= 1:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queues records for the listener thread; drops them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolve the message and traceback in the caller, keeping the extra fields."""
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _LoggingState:
+    """The installed handler and listener of this process."""
+
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self.config_class = Config
+        self.pid: Optional[int] = None
+        self.exit_hook = False
+        self.lock = threading.Lock()
+
+_state = _LoggingState()
+
+def configure_logging(config_class=Config):
+    """
+    Install JSON logging through a background queue (once per process).
+
+    Args:
+        config_class: Configuration profile providing LOG_* settings
+    """
+    with _state.lock:
+        if _state.listener is not None:
+            return
+        _state.config_class = config_class
+
+        root = logging.getLogger()
+        root.setLevel(config_class.LOG_LEVEL.upper())
+        for name, level in parse_settings(config_class.LOG_LEVELS, str.upper).items():
+            logging.getLogger(name).setLevel(level)
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(config_class.LOG_QUEUE_SIZE)
+        handler = NonBlockingQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(parse_settings(config_class.LOG_SAMPLE_RATES, float)))
+
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+
+        listener = QueueListener(log_queue, output, respect_handler_level=True)
+        listener.start()
+
+        _state.handler = handler
+        _state.listener = listener
+        _state.pid = os.getpid()
+
+        if not _state.exit_hook:
+            atexit.register(shutdown_logging)
+            _state.exit_hook = True
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread."""
+    with _state.lock:
+        listener = _state.listener
+        if listener is None or _state.pid != os.getpid():
+            return
+        _state.listener = None
+
+    listener.stop()
+
+    if _state.handler is not None and _state.handler.dropped:
+        sys.stderr.write(f"{_state.handler.dropped} log records were dropped because the log queue was full\n")
+
+def reinit_after_fork():
+    """Start a fresh queue and listener thread in a forked worker."""
+    with _state.lock:
+        if _state.listener is None:
+            return
+        # The parent's listener thread did not survive fork
+        _state.listener = None
+        handler = _state.handler
+        _state.handler = None
+        logging.getLogger().removeHandler(handler)
+
+    configure_logging(_state.config_class)
@@ -0,0 +1,307 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are sharded per thread: each thread only
+ever updates its own dictionary, so recording a value takes no lock. A
+scrape sums the shards. Shards of threads that have exited are folded into
+a retired shard the next time a thread registers, so short-lived threads
+do not accumulate.
+
+Besides request-level metrics, time spent in named stages (MongoDB, bcrypt,
+JWT) is recorded both on its own and per request, so a slow endpoint can
+be attributed to the stage it waits on. Every worker process keeps and
+reports its own metrics.
+"""
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds: from cache hits to slow bcrypt logins and queries
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bytes: from small JSON replies to MAX_CONTENT_LENGTH bodies
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    """Render a label set, e.g. {method="GET",status="200"}."""
+    pairs = ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return '{' + pairs + '}' if pairs else ''
+
+class _Family:
+    """A named metric with a fixed set of label names."""
+
+    kind = 'untyped'
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str, labelnames: Labels):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def render(self, values: Dict[Labels, Any]) -> List[str]:
+        """Exposition lines for the summed values of every label set."""
+        lines = []
+        for labels in sorted(values):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {values[labels]}')
+        return lines
+
+class Counter(_Family):
+    """A monotonically increasing value."""
+
+    kind = 'counter'
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        """
+        Increase the counter.
+
+        Args:
+            labels (tuple): Label values in the order of the label names
+            amount (float): Non-negative increment
+        """
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. requests in flight."""
+
+    kind = 'gauge'
+
+    def dec(self, labels: Labels = (), amount: float = 1):
+        """Decrease the gauge."""
+        self.inc(labels, -amount)
+
+class Histogram(_Family):
+    """Observations counted into cumulative buckets, with their sum."""
+
+    kind = 'histogram'
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str,
+                 labelnames: Labels, buckets: Tuple[float, ...]):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Labels = ()):
+        """
+        Record an observation.
+
+        Args:
+            value (float): Observed value (seconds, bytes, ...)
+            labels (tuple): Label values in the order of the label names
+        """
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the sum
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self, values: Dict[Labels, Any]) -> List[str]:
+        lines = []
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        names = self.labelnames + ('le',)
+
+        for labels in sorted(values):
+            counts = values[labels]
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}')
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{suffix} {counts[-1]}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    """Holds metric families and the per-thread shards their values live in."""
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._callbacks: List[Tuple[str, str, Callable[[], Optional[float]]]] = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded values, e.g. in a forked worker."""
+        self._local = threading.local()
+        self._shards: List[Tuple[weakref.ref, Dict]] = []
+        self._retired: Dict = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Labels = ()) -> Counter:
+        """Define a counter."""
+        return self._define(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Labels = ()) -> Gauge:
+        """Define a gauge updated with inc/dec."""
+        return self._define(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Labels = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """Define a histogram."""
+        return self._define(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, read: Callable[[], Optional[float]]):
+        """
+        Define a gauge read at scrape time.
+
+        Args:
+            read: Returns the current value, or None to omit the sample
+        """
+        with self._lock:
+            if all(existing != name for existing, _, _ in self._callbacks):
+                self._callbacks.append((name, documentation, read))
+
+    def _define(self, family: _Family) -> _Family:
+        with self._lock:
+            return self._families.setdefault(family.name, family)
+
+    def shard(self) -> Dict:
+        """The calling thread's shard, created on its first use."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            pass
+
+        shard = self._local.shard = {}
+        with self._lock:
+            live = []
+            for thread, other in self._shards:
+                if thread() is None or not thread().is_alive():
+                    # The thread no longer writes to it; fold it into the retired totals
+                    self._merge(self._retired, other)
+                else:
+                    live.append((thread, other))
+            live.append((weakref.ref(threading.current_thread()), shard))
+            self._shards = live
+        return shard
+
+    @staticmethod
+    def _merge(totals: Dict, shard: Dict):
+        """Add a shard's values into totals."""
+        for key, value in shard.copy().items():
+            if isinstance(value, list):
+                value = list(value)
+                current = totals.get(key)
+                totals[key] = value if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                totals[key] = totals.get(key, 0) + value
+
+    def collect(self) -> Dict[Tuple[str, Labels], Any]:
+        """Sum every shard."""
+        totals: Dict = {}
+        with self._lock:
+            self._merge(totals, self._retired)
+            for _, shard in self._shards:
+                self._merge(totals, shard)
+        return totals
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The scrape body
+        """
+        by_family: Dict[str, Dict[Labels, Any]] = {}
+        for (name, labels), value in self.collect().items():
+            by_family.setdefault(name, {})[labels] = value
+
+        lines = []
+        for family in list(self._families.values()):
+            lines.append(f'# HELP {family.name} {family.documentation}')
+            lines.append(f'# TYPE {family.name} {family.kind}')
+            lines.extend(family.render(by_family.get(family.name, {})))
+
+        for name, documentation, read in list(self._callbacks):
+            try:
+                value = read()
+            except Exception:
+                value = None
+            if value is None:
+                continue
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+# Global metrics registry instance
+metrics = MetricsRegistry()
+
+REQUESTS = metrics.counter(
+    'gramaconnect_http_requests_total', 'HTTP requests by endpoint, method and status code',
+    ('endpoint', 'method', 'status'))
+REQUEST_DURATION = metrics.histogram(
+    'gramaconnect_http_request_duration_seconds', 'HTTP request latency by endpoint and method',
+    ('endpoint', 'method'))
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    'gramaconnect_http_requests_in_flight', 'HTTP requests being handled')
+REQUEST_SIZE = metrics.histogram(
+    'gramaconnect_http_request_size_bytes', 'HTTP request body size by endpoint',
+    ('endpoint',), SIZE_BUCKETS)
+RESPONSE_SIZE = metrics.histogram(
+    'gramaconnect_http_response_size_bytes', 'HTTP response body size by endpoint',
+    ('endpoint',), SIZE_BUCKETS)
+STAGE_DURATION = metrics.histogram(
+    'gramaconnect_stage_duration_seconds', 'Duration of each MongoDB command, bcrypt call or JWT operation',
+    ('stage',))
+REQUEST_STAGE_SECONDS = metrics.counter(
+    'gramaconnect_http_request_stage_seconds_total', 'Time requests spent in each stage, by endpoint',
+    ('endpoint', 'stage'))
+
+# Per-thread stage totals of the request being handled
+_request = threading.local()
+
+def start_request():
+    """Begin attributing stage time to the current thread's request."""
+    _request.stages = {}
+
+def finish_request() -> Dict[str, float]:
+    """
+    Stop attributing stage time and return what the request spent per stage.
+
+    Returns:
+        dict: Seconds per stage
+    """
+    stages = getattr(_request, 'stages', None) or {}
+    _request.stages = None
+    return stages
+
+def record_stage(name: str, seconds: float):
+    """
+    Record time spent in a stage.
+
+    Args:
+        name (str): Stage name, e.g. 'mongodb'
+        seconds (float): Duration
+    """
+    STAGE_DURATION.observe(seconds, (name,))
+    stages = getattr(_request, 'stages', None)
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+@contextmanager
+def stage(name: str):
+    """
+    Time the enclosed block as a stage.
+
+    Usage:
+        with stage('bcrypt'):
+            password_hasher.check(password, hashed)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
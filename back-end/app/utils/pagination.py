@@ -0,0 +1,165 @@
+"""
+Keyset pagination and field projection helpers for listing endpoints.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
+from pymongo.collection import Collection
+
+_EPOCH = datetime(1970, 1, 1)
+
+class PaginationError(ValueError):
+    """Raised when pagination query parameters are invalid."""
+
+def encode_cursor(sort_value: Any, document_id: ObjectId) -> str:
+    """
+    Encode the position after a document as an opaque cursor.
+
+    Args:
+        sort_value: Value of the sort field on the last returned document
+        document_id (ObjectId): _id of the last returned document
+
+    Returns:
+        str: URL-safe cursor
+    """
+    if isinstance(sort_value, datetime):
+        # Milliseconds since the epoch, matching BSON date precision
+        value = {'ms': (sort_value - _EPOCH) // timedelta(milliseconds=1)}
+    else:
+        value = {'v': sort_value}
+
+    raw = json.dumps({**value, 'id': str(document_id)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): Opaque cursor
+
+    Returns:
+        tuple: (sort value, _id)
+
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        document_id = ObjectId(data['id'])
+
+        if 'ms' in data:
+            return _EPOCH + timedelta(milliseconds=int(data['ms'])), document_id
+        return data['v'], document_id
+
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise PaginationError('Invalid cursor') from e
+
+def parse_limit(value: Optional[str], default: int, maximum: int) -> int:
+    """
+    Parse the limit query parameter.
+
+    Args:
+        value (str): Raw parameter value
+        default (int): Limit used when absent
+        maximum (int): Largest accepted limit
+
+    Returns:
+        int: Page size
+
+    Raises:
+        PaginationError: If the value is not an integer between 1 and maximum
+    """
+    if value is None or value == '':
+        return default
+
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+
+    if limit < 1 or limit > maximum:
+        raise PaginationError(f'limit must be between 1 and {maximum}')
+
+    return limit
+
+def parse_projection(fields: Optional[str], summary: bool,
+                     allowed_fields: Iterable[str], summary_fields: Iterable[str],
+                     sort_field: str) -> Optional[Dict[str, int]]:
+    """
+    Build a projection from the fields/summary query parameters.
+
+    Args:
+        fields (str): Comma-separated field names, or None
+        summary (bool): Whether compact summary mode was requested
+        allowed_fields: Fields clients may request
+        summary_fields: Fields returned in summary mode
+        sort_field (str): Sort field, always included so cursors can be built
+
+    Returns:
+        dict: Projection, or None for full documents
+
+    Raises:
+        PaginationError: If an unknown field is requested
+    """
+    if fields:
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = sorted(set(requested) - set(allowed_fields))
+        if unknown:
+            raise PaginationError(f'Unknown fields: {", ".join(unknown)}')
+    elif summary:
+        requested = list(summary_fields)
+    else:
+        return None
+
+    projection = {field: 1 for field in requested}
+    projection[sort_field] = 1
+    return projection
+
+def paginate(collection: Collection, query: Dict[str, Any], sort_field: str,
+             limit: int, cursor: Optional[str] = None,
+             projection: Optional[Dict[str, int]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of documents, newest first, using keyset pagination on (sort_field, _id).
+
+    Args:
+        collection (Collection): Collection to read
+        query (dict): Base filter
+        sort_field (str): Field to order by, descending
+        limit (int): Page size
+        cursor (str): Cursor returned with the previous page
+        projection (dict): Fields to return, or None for full documents
+
+    Returns:
+        tuple: (documents, cursor for the next page or None)
+
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        query = {
+            '$and': [query, {'$or': [
+                {sort_field: {'$lt': sort_value}},
+                {sort_field: sort_value, '_id': {'$lt': last_id}}
+            ]}]
+        }
+
+    documents = list(
+        collection.find(query, projection)
+        .sort([(sort_field, DESCENDING), ('_id', DESCENDING)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last['_id'])
+
+    return documents, next_cursor
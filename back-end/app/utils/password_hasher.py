@@ -0,0 +1,181 @@
+"""
+Bounded worker pool for bcrypt hashing and verification.
+
+bcrypt costs tens to hundreds of milliseconds of CPU per call. Running it
+on a dedicated pool sized to the cores (bcrypt releases the GIL) caps how
+much CPU password work can take, and the bounded queue gives backpressure:
+when it is full, callers get HasherBusyError instead of piling up.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Union
+import bcrypt
+
+class HasherBusyError(Exception):
+    """Raised when the password hashing queue is saturated."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool."""
+
+    def __init__(self, rounds: int = 12, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, queue_timeout: float = 0.5,
+                 retry_after: int = 1):
+        """
+        Create the hasher.
+
+        Args:
+            rounds (int): bcrypt cost factor for new hashes
+            workers (int): Pool threads (default: number of CPUs)
+            max_pending (int): Jobs allowed to wait for a thread (default: 4 per thread)
+            queue_timeout (float): Seconds to wait for a queue slot before giving up
+            retry_after (int): Seconds clients are told to wait when the queue is full
+        """
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * 4 if max_pending is None else max_pending
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._dummy_lock = threading.Lock()
+        self._dummy_future: Optional[Future] = None
+        self._dummy_pid = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the pool on first use, and again in a forked child."""
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix='bcrypt'
+                    )
+                    self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, fn: Callable, *args, wait: bool = True) -> Future:
+        """
+        Queue a job on the pool.
+
+        Args:
+            fn: Function to run
+            *args: Function arguments
+            wait (bool): Wait up to queue_timeout for a slot; otherwise fail immediately
+
+        Returns:
+            Future: The job's future
+
+        Raises:
+            HasherBusyError: If no queue slot becomes free
+        """
+        executor = self._get_executor()
+        slots = self._slots
+
+        acquired = slots.acquire(timeout=self.queue_timeout) if wait else slots.acquire(blocking=False)
+        if not acquired:
+            raise HasherBusyError(self.retry_after)
+
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def hash(self, password: str) -> bytes:
+        """
+        Hash a password at the configured cost.
+
+        Args:
+            password (str): Plain text password
+
+        Returns:
+            bytes: Hashed password
+        """
+        return self.submit(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds)).result()
+
+    def check(self, password: str, hashed: Union[bytes, str]) -> bool:
+        """
+        Check a password against a hash.
+
+        Args:
+            password (str): Plain text password
+            hashed (bytes): Hashed password
+
+        Returns:
+            bool: True if password matches, False otherwise
+        """
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        return self.submit(bcrypt.checkpw, password.encode('utf-8'), hashed).result()
+
+    def submit_hash(self, password: str) -> Future:
+        """
+        Queue a hash at the configured cost without waiting for a queue slot.
+
+        Args:
+            password (str): Plain text password
+
+        Returns:
+            Future: Resolves to the hashed password
+
+        Raises:
+            HasherBusyError: If the queue is full
+        """
+        return self.submit(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds), wait=False)
+
+    def needs_rehash(self, hashed: Union[bytes, str]) -> bool:
+        """
+        Check whether a hash was made with a different cost than configured.
+
+        Args:
+            hashed (bytes): Hashed password, e.g. b'$2b$12$...'
+
+        Returns:
+            bool: True if the hash should be upgraded
+        """
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+
+        try:
+            return int(hashed.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def prepare_dummy_hash(self) -> Future:
+        """
+        Start computing the dummy hash on the pool, unless it is already done or under way.
+
+        Call at start-up so the first login for an unknown email does not pay for it.
+        A computation left unfinished by fork, or one that failed, is started again.
+
+        Returns:
+            Future: Resolves to the dummy hash
+
+        Raises:
+            HasherBusyError: If the queue is full
+        """
+        with self._dummy_lock:
+            future = self._dummy_future
+            if future is None or (future.done() and future.exception() is not None) or \
+                    (not future.done() and self._dummy_pid != os.getpid()):
+                future = self._dummy_future = self.submit(
+                    bcrypt.hashpw, os.urandom(16).hex().encode('utf-8'), bcrypt.gensalt(self.rounds)
+                )
+                self._dummy_pid = os.getpid()
+        return future
+
+    @property
+    def dummy_hash(self) -> bytes:
+        """A hash at the configured cost that no password matches, for constant-time misses."""
+        return self.prepare_dummy_hash().result()
@@ -0,0 +1,205 @@
+"""
+MongoDB command monitoring by query shape.
+
+A pymongo CommandListener reduces every command to its shape: the command,
+the collection and the filter and sort fields without their values, e.g.
+applications.find{user_id}.sort{submitted_date} or
+grama_niladhari.find{district_norm:$regex}. Count, time and slow commands
+are aggregated per shape in the metrics registry. Commands slower than a
+threshold are written to the slow query log with their shape, never their
+values.
+"""
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+from bson.regex import Regex
+from flask import has_request_context, request
+from pymongo import monitoring
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Handshakes and heartbeats issued by the driver itself
+IGNORED_COMMANDS = frozenset({
+    'hello', 'ismaster', 'isMaster', 'ping', 'buildInfo', 'endSessions', 'saslStart', 'saslContinue'
+})
+
+# Shapes tracked before new ones are counted as 'other'
+MAX_SHAPES = 1000
+
+LOGICAL_OPERATORS = ('$and', '$or', '$nor')
+
+COMMANDS = metrics.counter(
+    'gramaconnect_mongodb_commands_total', 'MongoDB commands by command, collection and query shape',
+    ('command', 'collection', 'shape'))
+COMMAND_SECONDS = metrics.counter(
+    'gramaconnect_mongodb_command_seconds_total', 'Time spent in MongoDB commands by query shape',
+    ('command', 'collection', 'shape'))
+SLOW_COMMANDS = metrics.counter(
+    'gramaconnect_mongodb_slow_commands_total', 'MongoDB commands over the slow query threshold by query shape',
+    ('command', 'collection', 'shape'))
+COMMAND_FAILURES = metrics.counter(
+    'gramaconnect_mongodb_command_failures_total', 'Failed MongoDB commands by command and collection',
+    ('command', 'collection'))
+COMMAND_DURATION = metrics.histogram(
+    'gramaconnect_mongodb_command_duration_seconds', 'MongoDB command latency by command and collection',
+    ('command', 'collection'))
+
+def filter_shape(query: Any) -> str:
+    """
+    Describe a filter by its fields and operators, without values.
+
+    Args:
+        query (dict): MongoDB filter
+
+    Returns:
+        str: e.g. '{district_norm:$regex,status}'
+    """
+    if not isinstance(query, dict):
+        return '{}'
+
+    parts = []
+    for key in sorted(query):
+        value = query[key]
+        if key in LOGICAL_OPERATORS and isinstance(value, list):
+            branches = sorted({filter_shape(branch) for branch in value})
+            parts.append(f"{key}[{'|'.join(branches)}]")
+        elif isinstance(value, (Regex, re.Pattern)):
+            parts.append(f"{key}:$regex")
+        elif isinstance(value, dict) and value and all(str(op).startswith('$') for op in value):
+            parts.append(f"{key}:{','.join(sorted(value))}")
+        else:
+            parts.append(key)
+    return '{' + ','.join(parts) + '}'
+
+def _fields(spec: Any) -> str:
+    """Field names of a sort or projection document, in order."""
+    return '{' + ','.join(spec) + '}' if isinstance(spec, dict) else '{}'
+
+def _statement_shapes(statements: Iterable[Dict[str, Any]], key: str) -> str:
+    """Distinct filter shapes of a bulk update or delete."""
+    return '|'.join(sorted({filter_shape(statement.get(key)) for statement in statements or ()}))
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Normalize a command to its collection and query shape.
+
+    Args:
+        command_name (str): e.g. 'find'
+        command (dict): The command document sent to the server
+
+    Returns:
+        tuple: (collection, shape), e.g. ('applications', 'applications.find{user_id}.sort{submitted_date}')
+    """
+    collection = command.get('collection' if command_name == 'getMore' else command_name)
+    collection = collection if isinstance(collection, str) else ''
+    shape = f"{collection}.{command_name}"
+
+    if command_name == 'find':
+        shape += filter_shape(command.get('filter'))
+        if command.get('sort'):
+            shape += f".sort{_fields(command['sort'])}"
+    elif command_name == 'aggregate':
+        stages = []
+        for stage in command.get('pipeline') or ():
+            name = next(iter(stage), '') if isinstance(stage, dict) else ''
+            if name == '$match':
+                stages.append(f"$match{filter_shape(stage[name])}")
+            elif name == '$sort':
+                stages.append(f"$sort{_fields(stage[name])}")
+            else:
+                stages.append(name)
+        shape += f"[{','.join(stages)}]"
+    elif command_name in ('count', 'distinct'):
+        shape += filter_shape(command.get('query'))
+    elif command_name == 'findAndModify':
+        shape += filter_shape(command.get('query'))
+        if command.get('sort'):
+            shape += f".sort{_fields(command['sort'])}"
+    elif command_name == 'update':
+        shape += _statement_shapes(command.get('updates'), 'q')
+    elif command_name == 'delete':
+        shape += _statement_shapes(command.get('deletes'), 'q')
+
+    return collection, shape
+
+class QueryMonitor(monitoring.CommandListener):
+    """Aggregates MongoDB commands by shape and logs slow ones."""
+
+    def __init__(self, slow_ms: float = 100, max_shapes: int = MAX_SHAPES):
+        """
+        Create the monitor.
+
+        Args:
+            slow_ms (float): Commands at or above this duration go to the slow query log
+            max_shapes (int): Distinct shapes tracked before the rest are counted as 'other'
+        """
+        self.slow_ms = slow_ms
+        self.max_shapes = max_shapes
+        self._shapes = set()
+        self._lock = threading.Lock()
+        # Commands in progress: (connection, request id) -> (command, collection, shape, endpoint)
+        self._pending: Dict[Tuple[Any, int], Tuple[str, str, str, Optional[str]]] = {}
+
+    def _track(self, shape: str) -> str:
+        """Bound the number of distinct shapes reported."""
+        if shape in self._shapes:
+            return shape
+        with self._lock:
+            if len(self._shapes) >= self.max_shapes:
+                return 'other'
+            self._shapes.add(shape)
+        return shape
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+
+        try:
+            collection, shape = command_shape(event.command_name, event.command)
+        except Exception:
+            collection, shape = '', event.command_name
+
+        endpoint = None
+        if has_request_context() and request.url_rule is not None:
+            endpoint = request.url_rule.rule
+
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.command_name, collection, self._track(shape), endpoint
+        )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        """Record a finished command."""
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+
+        command, collection, shape, endpoint = pending
+        seconds = event.duration_micros / 1e6
+        labels = (command, collection, shape)
+
+        COMMANDS.inc(labels)
+        COMMAND_SECONDS.inc(labels, seconds)
+        COMMAND_DURATION.observe(seconds, (command, collection))
+        if failed:
+            COMMAND_FAILURES.inc((command, collection))
+
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.slow_ms:
+            SLOW_COMMANDS.inc(labels)
+            logger.warning('Slow MongoDB command', extra={
+                'command': command,
+                'collection': collection,
+                'shape': shape,
+                'duration_ms': round(duration_ms, 3),
+                'database': event.database_name,
+                'endpoint': endpoint,
+                'failed': failed
+            })
@@ -0,0 +1,249 @@
+"""
+Rate limiting and load shedding for the bcrypt-bearing auth endpoints.
+
+Each limit is a token bucket: it holds up to N tokens, refills at N per
+period, and every request takes one. Buckets are keyed by client IP and
+by the (hashed) email in the request body. They live in process memory
+by default; with RATE_LIMIT_STORE=mongodb they are shared by every worker
+through the rate_limits collection, and fall back to memory when it is
+unreachable. A per-process cap on concurrent auth requests sheds the rest.
+
+All of this runs before the view, so a rejected request costs neither a
+database lookup nor a bcrypt call.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Callable, Optional, Tuple
+from flask import jsonify, request
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from config.config import Config
+from app.database import database_manager
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = metrics.counter(
+    'gramaconnect_rate_limited_total', 'Requests rejected by a rate limit, by endpoint and key type',
+    ('endpoint', 'key'))
+SHED = metrics.counter(
+    'gramaconnect_auth_shed_total', 'Auth requests shed by the concurrency cap, by endpoint',
+    ('endpoint',))
+
+def parse_limit(value: str) -> Tuple[int, float]:
+    """
+    Parse a "requests/seconds" limit.
+
+    Args:
+        value (str): e.g. '20/60' for 20 requests per minute
+
+    Returns:
+        tuple: (capacity, refill rate in tokens per second)
+
+    Raises:
+        ValueError: If the limit is malformed
+    """
+    requests, _, seconds = value.partition('/')
+    capacity, period = int(requests), float(seconds or 1)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f"Invalid rate limit '{value}'")
+    return capacity, capacity / period
+
+class MemoryRateLimitStore:
+    """Token buckets in process memory, striped across locks."""
+
+    def __init__(self, max_keys: int, stripes: int = 16):
+        """
+        Create the store.
+
+        Args:
+            max_keys (int): Buckets kept before the least recently used are dropped
+            stripes (int): Independently locked partitions
+        """
+        self.max_keys_per_stripe = max(1, max_keys // stripes)
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(stripes)]
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        """
+        Take a token from a bucket.
+
+        Args:
+            key (str): Bucket key
+            capacity (int): Bucket size
+            rate (float): Tokens added per second
+
+        Returns:
+            tuple: (allowed, seconds until a token is available)
+        """
+        lock, buckets = self._stripes[hash(key) % len(self._stripes)]
+        now = time.monotonic()
+
+        with lock:
+            tokens, updated = buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+            if len(buckets) > self.max_keys_per_stripe:
+                buckets.popitem(last=False)
+
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+class MongoRateLimitStore:
+    """Token buckets shared through MongoDB, updated atomically per request."""
+
+    def __init__(self, fallback: MemoryRateLimitStore):
+        """
+        Create the store.
+
+        Args:
+            fallback (MemoryRateLimitStore): Used while MongoDB is unavailable
+        """
+        self.fallback = fallback
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        """Take a token from a shared bucket (see MemoryRateLimitStore.take)."""
+        collection = database_manager.collection('rate_limits')
+        if collection is None:
+            return self.fallback.take(key, capacity, rate)
+
+        now = datetime.utcnow()
+        elapsed = {'$divide': [{'$subtract': [now, {'$ifNull': ['$updated_at', now]}]}, 1000]}
+        refilled = {'$min': [capacity, {'$add': [{'$ifNull': ['$tokens', capacity]}, {'$multiply': [elapsed, rate]}]}]}
+
+        try:
+            bucket = collection.find_one_and_update(
+                {'_id': key},
+                [
+                    {'$set': {'tokens': refilled, 'updated_at': now}},
+                    {'$set': {'allowed': {'$gte': ['$tokens', 1]}}},
+                    {'$set': {
+                        'tokens': {'$cond': ['$allowed', {'$subtract': ['$tokens', 1]}, '$tokens']},
+                        # A bucket is full again, and can be forgotten, once it has refilled
+                        'expires_at': now + timedelta(seconds=capacity / rate)
+                    }}
+                ],
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            logger.warning('Shared rate limit store unavailable; using process memory', extra={'error': str(e)})
+            return self.fallback.take(key, capacity, rate)
+
+        if bucket['allowed']:
+            return True, 0.0
+        return False, (1 - bucket['tokens']) / rate
+
+def client_ip() -> str:
+    """
+    The client address, taken from X-Forwarded-For only as far as trusted proxies set it.
+
+    Returns:
+        str: IP address
+    """
+    trusted = Config.RATE_LIMIT_TRUSTED_PROXIES
+    if trusted:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= trusted:
+            return forwarded[-trusted]
+    return request.remote_addr or 'unknown'
+
+def request_email() -> Optional[str]:
+    """The hashed, normalized email in the JSON body, if any."""
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+
+def too_many_requests(retry_after: float):
+    """
+    Build the 429 response for a request over its rate limit.
+
+    Args:
+        retry_after (float): Seconds until the request would be allowed
+
+    Returns:
+        tuple: Flask response, status code and headers
+    """
+    return (
+        jsonify({'error': 'Too many requests, please try again later'}),
+        429,
+        {'Retry-After': str(max(1, math.ceil(retry_after)))}
+    )
+
+class AuthRateLimiter:
+    """Applies the per-IP and per-email limits and the concurrency cap to auth endpoints."""
+
+    def __init__(self, max_concurrent: int, max_keys: int, store: str = 'memory'):
+        """
+        Create the limiter.
+
+        Args:
+            max_concurrent (int): Auth requests handled at once per process
+            max_keys (int): Buckets kept in process memory
+            store (str): 'memory' or 'mongodb'
+        """
+        memory = MemoryRateLimitStore(max_keys)
+        self.store = MongoRateLimitStore(memory) if store == 'mongodb' else memory
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def limit(self, endpoint: str, ip_limit: str, email_limit: str,
+              exempt: Optional[Callable[[], bool]] = None):
+        """
+        Decorator limiting an endpoint.
+
+        Args:
+            endpoint (str): Name used in bucket keys and metrics, e.g. 'login'
+            ip_limit (str): "requests/seconds" per client IP
+            email_limit (str): "requests/seconds" per email in the body
+            exempt: Returns True for requests that skip the limits, e.g. idempotent replays
+        """
+        ip_capacity, ip_rate = parse_limit(ip_limit)
+        email_capacity, email_rate = parse_limit(email_limit)
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if exempt is not None and exempt():
+                    return f(*args, **kwargs)
+
+                allowed, retry_after = self.store.take(f"{endpoint}:ip:{client_ip()}", ip_capacity, ip_rate)
+                if not allowed:
+                    RATE_LIMITED.inc((endpoint, 'ip'))
+                    return too_many_requests(retry_after)
+
+                email = request_email()
+                if email is not None:
+                    allowed, retry_after = self.store.take(f"{endpoint}:email:{email}", email_capacity, email_rate)
+                    if not allowed:
+                        RATE_LIMITED.inc((endpoint, 'email'))
+                        return too_many_requests(retry_after)
+
+                # Shed instead of queueing behind bcrypt when every slot is busy
+                if not self._slots.acquire(blocking=False):
+                    SHED.inc((endpoint,))
+                    return jsonify({'error': 'Server is busy, please try again shortly'}), 503, \
+                        {'Retry-After': str(Config.BCRYPT_RETRY_AFTER_SECONDS)}
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    self._slots.release()
+
+            return decorated_function
+
+        return decorator
+
+# Global auth rate limiter instance
+auth_rate_limiter = AuthRateLimiter(
+    Config.AUTH_MAX_CONCURRENT,
+    Config.RATE_LIMIT_MAX_KEYS,
+    Config.RATE_LIMIT_STORE
+)
@@ -0,0 +1,249 @@
+"""
+Declarative request schemas compiled into validator functions.
+
+A schema is a list of fields. compile_schema() turns it into a single
+function once, at import time, with every per-field decision (accepted
+keys, type check, length limits, patterns) resolved up front, so
+validating a request is one pass over a precomputed plan. All errors in
+a request are reported together.
+"""
+import re
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional, Pattern, Tuple
+
+# Sri Lankan NIC: 9 digits and V/X (old format) or 12 digits (new format)
+NIC_PATTERN = re.compile(r'\d{9}[VX]|\d{12}')
+
+# Local or international phone number, digits with optional spaces/dashes
+PHONE_PATTERN = re.compile(r'\+?\d[\d \-]{6,18}\d')
+
+# A field check returns (value, None) or (None, error message)
+Check = Callable[[Any], Tuple[Any, Optional[str]]]
+
+class ValidationError(ValueError):
+    """Raised when a request does not match its schema."""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__('; '.join(f'{field} {message}' for field, message in errors.items()))
+        self.errors = errors
+
+class Field(ABC):
+    """A request field: where it is read from and whether it must be present."""
+
+    def __init__(self, name: str, *aliases: str, required: bool = False):
+        """
+        Describe a field.
+
+        Args:
+            name (str): Name in the validated output (snake_case)
+            *aliases (str): Request keys accepted for it, in order of preference;
+                            the name itself is always accepted last
+            required (bool): Whether a non-empty value must be supplied
+        """
+        self.name = name
+        self.keys = aliases + (name,)
+        self.required = required
+
+    def default(self) -> Any:
+        """Value used when an optional field is absent."""
+        return ''
+
+    @abstractmethod
+    def compile(self) -> Check:
+        """Build the check for a supplied value."""
+
+class String(Field):
+    """A text field, stripped of surrounding whitespace."""
+
+    def __init__(self, name: str, *aliases: str, required: bool = False,
+                 max_length: int = 200, pattern: Optional[Pattern] = None,
+                 message: str = 'has an invalid format'):
+        """
+        Describe a text field.
+
+        Args:
+            max_length (int): Longest accepted value after stripping
+            pattern (Pattern): Regular expression the whole value must match
+            message (str): Error when the pattern does not match
+        """
+        super().__init__(name, *aliases, required=required)
+        self.max_length = max_length
+        self.pattern = pattern
+        self.message = message
+
+    def normalize(self, value: str) -> str:
+        """Canonical form of a stripped value, checked against the pattern."""
+        return value
+
+    def compile(self) -> Check:
+        max_length = self.max_length
+        too_long = f'must be at most {max_length} characters'
+        fullmatch = self.pattern.fullmatch if self.pattern else None
+        message = self.message
+        normalize = self.normalize
+
+        def check(value):
+            if not isinstance(value, str):
+                return None, 'must be a string'
+            value = value.strip()
+            if len(value) > max_length:
+                return None, too_long
+            if value and fullmatch is not None:
+                value = normalize(value)
+                if fullmatch(value) is None:
+                    return None, message
+            return value, None
+
+        return check
+
+class Nic(String):
+    """A Sri Lankan National Identity Card number, stored upper-case."""
+
+    def __init__(self, name: str, *aliases: str, required: bool = False):
+        super().__init__(name, *aliases, required=required, max_length=12,
+                         pattern=NIC_PATTERN, message='must be a valid NIC number (e.g. 123456789V or 200012345678)')
+
+    def normalize(self, value: str) -> str:
+        return value.upper()
+
+class Phone(String):
+    """A phone number."""
+
+    def __init__(self, name: str, *aliases: str, required: bool = False):
+        super().__init__(name, *aliases, required=required, max_length=20,
+                         pattern=PHONE_PATTERN, message='must be a phone number')
+
+class Choice(String):
+    """A text field limited to a fixed set of values."""
+
+    def __init__(self, name: str, *aliases: str, choices: Iterable[str], required: bool = False):
+        choices = tuple(choices)
+        super().__init__(name, *aliases, required=required, max_length=max(map(len, choices)),
+                         pattern=re.compile('|'.join(map(re.escape, choices))),
+                         message=f'must be one of: {", ".join(choices)}')
+
+class Date(Field):
+    """A calendar date in ISO format (YYYY-MM-DD), stored as that string."""
+
+    def __init__(self, name: str, *aliases: str, required: bool = False,
+                 earliest: date = date(1900, 1, 1), allow_future: bool = True):
+        """
+        Describe a date field.
+
+        Args:
+            earliest (date): Earliest accepted date
+            allow_future (bool): Whether dates after today are accepted
+        """
+        super().__init__(name, *aliases, required=required)
+        self.earliest = earliest
+        self.allow_future = allow_future
+
+    def compile(self) -> Check:
+        earliest = self.earliest
+        allow_future = self.allow_future
+
+        def check(value):
+            if not isinstance(value, str):
+                return None, 'must be a date (YYYY-MM-DD)'
+            try:
+                parsed = date.fromisoformat(value.strip().split('T')[0])
+            except ValueError:
+                return None, 'must be a date (YYYY-MM-DD)'
+            if parsed < earliest:
+                return None, f'must not be before {earliest.isoformat()}'
+            if not allow_future and parsed > date.today():
+                return None, 'must not be in the future'
+            return parsed.isoformat(), None
+
+        return check
+
+class Array(Field):
+    """A bounded array whose items all pass one check."""
+
+    def __init__(self, name: str, *aliases: str, item: Field,
+                 required: bool = False, max_items: int = 10):
+        """
+        Describe an array field.
+
+        Args:
+            item (Field): Schema for every item (its name is not used)
+            max_items (int): Largest accepted number of items
+        """
+        super().__init__(name, *aliases, required=required)
+        self.item = item
+        self.max_items = max_items
+
+    def default(self) -> Any:
+        return []
+
+    def compile(self) -> Check:
+        max_items = self.max_items
+        too_many = f'must have at most {max_items} items'
+        check_item = self.item.compile()
+
+        def check(value):
+            if not isinstance(value, list):
+                return None, 'must be a list'
+            if len(value) > max_items:
+                return None, too_many
+            items = []
+            for index, item in enumerate(value):
+                item, error = check_item(item)
+                if error:
+                    return None, f'item {index + 1} {error}'
+                items.append(item)
+            return items, None
+
+        return check
+
+def compile_schema(fields: Iterable[Field]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Compile a list of fields into a validator.
+
+    Args:
+        fields (list): Field declarations
+
+    Returns:
+        callable: validate(data) returning the validated fields by name and
+                  raising ValidationError with every problem found
+    """
+    plan = tuple((field.name, field.keys, field.required, field.compile(), field.default)
+                 for field in fields)
+
+    def validate(data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict):
+            raise ValidationError({'body': 'must be a JSON object'})
+
+        get = data.get
+        result = {}
+        errors = {}
+
+        for name, keys, required, check, default in plan:
+            value = None
+            for key in keys:
+                value = get(key)
+                if value is not None and value != '':
+                    break
+
+            if value is None or value == '':
+                if required:
+                    errors[keys[0]] = 'is required'
+                else:
+                    result[name] = default()
+                continue
+
+            value, error = check(value)
+            if error:
+                errors[keys[0]] = error
+            elif required and not value:
+                errors[keys[0]] = 'is required'
+            else:
+                result[name] = value
+
+        if errors:
+            raise ValidationError(errors)
+
+        return result
+
+    return validate
@@ -0,0 +1,58 @@
+"""
+Benchmark bcrypt cost factors and the password hashing pool.
+
+Prints, for each cost factor, the single-hash latency and the verification
+throughput through the bounded pool, to help pick BCRYPT_ROUNDS and
+BCRYPT_WORKERS for a host.
+
+Usage:
+    python benchmarks/bcrypt_cost.py [--rounds 10 11 12 13] [--samples 20]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import time
+import bcrypt
+from app.utils.password_hasher import PasswordHasher
+
+def benchmark_rounds(rounds: int, samples: int, workers: int) -> dict:
+    """Measure hash latency and pooled verification throughput for one cost factor."""
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=samples, queue_timeout=60)
+
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hashed = hasher.hash('benchmark-password')
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    futures = [hasher.submit(bcrypt.checkpw, b'benchmark-password', hashed) for _ in range(samples)]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'rounds': rounds,
+        'workers': workers,
+        'hash_ms_p50': round(statistics.median(latencies), 2),
+        'hash_ms_max': round(max(latencies), 2),
+        'verifications_per_second': round(samples / elapsed, 2)
+    }
+
+def main():
+    """Run the benchmark and print one JSON object per cost factor."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--samples', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    for rounds in args.rounds:
+        print(json.dumps(benchmark_rounds(rounds, args.samples, args.workers)))
+
+if __name__ == '__main__':
+    main()
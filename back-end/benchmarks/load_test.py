@@ -0,0 +1,387 @@
+"""
+Load test the back-end in-process against a seeded database.
+
+Builds the app with create_app() against a real mongod (--mongo-uri) or,
+by default, an in-memory mongomock stand-in. It seeds users, applications
+and a national Grama Niladhari directory, then drives a weighted mix of
+register/login/submit/list/search requests from concurrent threads through
+the WSGI test client. Per-scenario p50/p95/p99 latency and requests per
+second, with status code counts, are written as JSON. Runs use a fixed
+random seed and record the git commit, so results from different commits
+can be compared; pass --baseline to fail when p95 latency regresses.
+
+Auth rate limits are lifted (every simulated client shares one address),
+and the auth concurrency cap and bcrypt queue are sized to --concurrency,
+so requests wait for bcrypt instead of being shed. Set AUTH_MAX_CONCURRENT
+or BCRYPT_MAX_PENDING to measure shedding; shed requests (503) are counted
+as "shed", apart from "errors".
+
+Usage:
+    python benchmarks/load_test.py [--users 1000] [--applications 20000] [--officials 14022]
+                                   [--requests 5000] [--concurrency 8]
+                                   [--mix list=40,search=30,submit=15,login=10,register=5]
+                                   [--mongo-uri mongodb://localhost:27017] [--output result.json]
+                                   [--baseline previous.json --max-regression 0.2]
+
+Realistic national volumes (use a real mongod):
+    python benchmarks/load_test.py --mongo-uri mongodb://localhost:27017 \\
+        --users 100000 --applications 2000000 --officials 14022
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+
+DISTRICTS = (
+    'Colombo', 'Gampaha', 'Kalutara', 'Kandy', 'Matale', 'Nuwara Eliya', 'Galle', 'Matara',
+    'Hambantota', 'Jaffna', 'Kilinochchi', 'Mannar', 'Vavuniya', 'Mullaitivu', 'Batticaloa',
+    'Ampara', 'Trincomalee', 'Kurunegala', 'Puttalam', 'Anuradhapura', 'Polonnaruwa', 'Badulla',
+    'Moneragala', 'Ratnapura', 'Kegalle'
+)
+SURNAMES = ('Silva', 'Fernando', 'Perera', 'Jayasinghe', 'Bandara', 'Wickramasinghe',
+            'Rajapaksa', 'Kumar', 'Sivakumar', 'Dissanayake', 'Herath', 'Gunawardena')
+
+SUBMISSIONS = {
+    'marriage-certificate': {
+        'applicantName': 'Kasun Perera', 'spouseName': 'Nimali Silva', 'marriageDate': '2024-02-14',
+        'marriagePlace': 'Kandy', 'applicantNIC': '199012345678', 'spouseNIC': '923456789V'
+    },
+    'character-certificate': {
+        'applicantName': 'Kasun Perera', 'nicNumber': '199012345678', 'purpose': 'Employment',
+        'residenceAddress': '12 Temple Road, Kandy', 'periodOfResidence': '10 years'
+    },
+    'voter-registration': {
+        'applicantName': 'Kasun Perera', 'nicNumber': '199012345678', 'updateType': 'address_change',
+        'currentAddress': '12 Temple Road, Kandy', 'newAddress': '4 Lake Drive, Colombo 07'
+    }
+}
+
+DEFAULT_MIX = 'list=40,search=30,submit=15,login=10,register=5'
+PASSWORD = 'benchmark-password'
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--applications', type=int, default=20000)
+    parser.add_argument('--officials', type=int, default=14022)
+    parser.add_argument('--requests', type=int, default=5000, help='Measured requests across all scenarios')
+    parser.add_argument('--warmup', type=int, default=200, help='Unmeasured requests before measuring')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Scenario weights, e.g. list=40,search=30')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bcrypt-rounds', type=int, default=None,
+                        help='Override BCRYPT_ROUNDS (default: the configured cost)')
+    parser.add_argument('--mongo-uri', default=None, help='Real mongod to use instead of mongomock')
+    parser.add_argument('--database', default='gramaconnect_benchmark')
+    parser.add_argument('--output', default=None, help='Write the JSON report here as well as to stdout')
+    parser.add_argument('--baseline', default=None, help='Earlier report to compare p95 latency against')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Allowed relative p95 increase over the baseline before failing')
+    return parser.parse_args()
+
+def configure_environment(args):
+    """Point the configuration at the benchmark database before the app or its config is imported."""
+    os.environ['DATABASE_NAME'] = args.database
+    os.environ.setdefault('SUBMISSION_QUEUE_ENABLED', 'false')
+    # Every simulated client shares one address; measure the endpoints, not the rate limiter
+    for limit in ('LOGIN_RATE_LIMIT_IP', 'LOGIN_RATE_LIMIT_EMAIL', 'REGISTER_RATE_LIMIT_IP', 'REGISTER_RATE_LIMIT_EMAIL'):
+        os.environ.setdefault(limit, '1000000000/1')
+    # Let every worker thread in at once and queue for bcrypt, rather than shed login/register
+    os.environ.setdefault('AUTH_MAX_CONCURRENT', str(args.concurrency))
+    os.environ.setdefault('BCRYPT_MAX_PENDING', str(args.concurrency))
+    # Keep stdout for the report
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    if args.bcrypt_rounds is not None:
+        os.environ['BCRYPT_ROUNDS'] = str(args.bcrypt_rounds)
+
+    if args.mongo_uri:
+        os.environ['MONGODB_URI'] = args.mongo_uri
+        return 'mongod'
+
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit('mongomock is not installed: pip install mongomock, or pass --mongo-uri')
+
+    # Config reads the environment when first imported, which importing app.database does
+    os.environ['MONGODB_URI'] = 'mongodb://benchmark'
+    import app.database
+    store = mongomock.store.ServerStore()
+
+    class InMemoryMongoClient(mongomock.MongoClient):
+        """mongomock client accepting the real client's arguments; reconnects keep the data."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(_store=store)
+
+    app.database.MongoClient = InMemoryMongoClient
+    return 'mongomock'
+
+def seed_officials(db, count, rng):
+    """Insert a national directory of active officials."""
+    from app.models.grama_niladhari import normalized_fields
+
+    db.grama_niladhari.delete_many({})
+    officials = []
+    for index in range(count):
+        district = DISTRICTS[index % len(DISTRICTS)]
+        secretariat = f"{district} DS {index // len(DISTRICTS) % 13 + 1}"
+        official = {
+            'name': f"{rng.choice(('Mr.', 'Ms.'))} {chr(65 + index % 26)}.{chr(65 + index // 26 % 26)}. {rng.choice(SURNAMES)}",
+            'designation': 'Grama Niladhari',
+            'employee_id': f"GN{index:06d}",
+            'district': district,
+            'divisional_secretariat': secretariat,
+            'grama_niladhari_division': f"{district} {index // len(DISTRICTS) + 1:03d}",
+            'division_code': f"{district[:3].upper()}{index:05d}",
+            'office_phone': f"011{index:07d}",
+            'status': 'active',
+            'created_at': datetime.utcnow()
+        }
+        official.update(normalized_fields(official))
+        officials.append(official)
+
+    for start in range(0, len(officials), 10000):
+        db.grama_niladhari.insert_many(officials[start:start + 10000], ordered=False)
+
+def seed_users(db, count):
+    """Insert users sharing one precomputed password hash."""
+    from app.utils.auth_utils import hash_password
+
+    db.users.delete_many({})
+    hashed = hash_password(PASSWORD)
+    now = datetime.utcnow()
+    ids = []
+
+    for start in range(0, count, 10000):
+        batch = [{
+            'name': f"Benchmark User {index}",
+            'email': f"user{index}@benchmark.lk",
+            'password': hashed,
+            'phone': '0771234567',
+            'nic': '199012345678',
+            'role': 'citizen',
+            'created_at': now,
+            'updated_at': now
+        } for index in range(start, min(start + 10000, count))]
+        ids.extend(db.users.insert_many(batch, ordered=False).inserted_ids)
+
+    return ids
+
+def seed_applications(db, count, user_ids, rng):
+    """Insert applications spread over users and the last two years (never today)."""
+    from app.services.applications import SERVICES, new_application
+    from app.services.reference_numbers import SERVICE_PREFIXES, format_reference_number
+
+    db.applications.delete_many({})
+    db.counters.delete_many({})
+    payloads = {service_type: SERVICES[service_type].validate(SUBMISSIONS[service_type.replace('_', '-')])
+                for service_type in SERVICES}
+    service_types = list(SERVICES)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    sequences = {}
+
+    for start in range(0, count, 10000):
+        batch = []
+        for _ in range(min(10000, count - start)):
+            service_type = rng.choice(service_types)
+            submitted = today - timedelta(seconds=rng.randint(1, 730 * 24 * 3600))
+            prefix, day = SERVICE_PREFIXES[service_type], submitted.strftime('%Y%m%d')
+            key = f"{prefix}{day}"
+            sequences[key] = sequences.get(key, 0) + 1
+            batch.append(new_application(service_type, rng.choice(user_ids), dict(payloads[service_type]),
+                                         format_reference_number(prefix, day, sequences[key]), submitted))
+        db.applications.insert_many(batch, ordered=False)
+
+def parse_mix(mix):
+    """Parse 'name=weight,...' into scenario names and weights."""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in SCENARIOS:
+            sys.exit(f"Unknown scenario '{name.strip()}'; choose from {', '.join(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return list(weights), list(weights.values())
+
+def scenario_list(client, ctx, rng):
+    return client.get('/api/services/applications?limit=20', headers=ctx['auth'](rng))
+
+def scenario_search(client, ctx, rng):
+    district = rng.choice(DISTRICTS)
+    if rng.random() < 0.5:
+        return client.get(f"/api/grama-niladhari/district/{district}", headers=ctx['auth'](rng))
+    return client.get(f"/api/grama-niladhari/search?district={district}&name={rng.choice(SURNAMES)[:3]}",
+                      headers=ctx['auth'](rng))
+
+def scenario_submit(client, ctx, rng):
+    path = rng.choice(list(SUBMISSIONS))
+    return client.post(f"/api/services/{path}", json=SUBMISSIONS[path], headers=ctx['auth'](rng))
+
+def scenario_login(client, ctx, rng):
+    email = f"user{rng.randrange(ctx['users'])}@benchmark.lk"
+    return client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+
+def scenario_register(client, ctx, rng):
+    with ctx['lock']:
+        ctx['registered'] += 1
+        index = ctx['registered']
+    return client.post('/api/auth/register', json={
+        'name': f"New User {index}", 'email': f"new{index}-{ctx['run']}@benchmark.lk", 'password': PASSWORD
+    })
+
+SCENARIOS = {
+    'list': scenario_list,
+    'search': scenario_search,
+    'submit': scenario_submit,
+    'login': scenario_login,
+    'register': scenario_register
+}
+
+def drive(app, ctx, names, weights, total, concurrency, seed):
+    """Run requests from worker threads; return per-scenario latencies, status code counts and wall time."""
+    latencies = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    counter = iter(range(total))
+    counter_lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        client = app.test_client()
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    return
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            response = SCENARIOS[name](client, ctx, rng)
+            elapsed = (time.perf_counter() - start) * 1000
+            latencies[name].append(elapsed)
+            codes = statuses[name]
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - start
+
+def summarize(samples, statuses, wall):
+    """Latency percentiles, throughput and status codes for a list of samples in milliseconds."""
+    shed = statuses.get(503, 0)
+    errors = sum(count for status, count in statuses.items() if status >= 400) - shed
+    if not samples:
+        return {'requests': 0, 'errors': errors, 'shed': shed}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive') if len(samples) > 1 else [samples[0]] * 99
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'shed': shed,
+        'rps': round(len(samples) / wall, 2),
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+        'max_ms': round(max(samples), 3),
+        'status_codes': {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(report, baseline_path, max_regression):
+    """Return the scenarios whose p95 regressed beyond the allowed ratio."""
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+
+    regressions = {}
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name, {}).get('p95_ms')
+        if before and result.get('p95_ms') and result['p95_ms'] > before * (1 + max_regression):
+            regressions[name] = {'baseline_p95_ms': before, 'p95_ms': result['p95_ms'],
+                                 'change': round(result['p95_ms'] / before - 1, 3)}
+    return regressions
+
+def main():
+    """Seed, warm up, measure and report."""
+    args = parse_args()
+    backend = configure_environment(args)
+    names, weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+
+    from config.config import ProductionConfig
+    from app.app_factory import create_app
+    from app.database import database_manager
+    from app.utils.auth_utils import generate_jwt_token
+
+    app = create_app(ProductionConfig)
+    db = database_manager.get_database()
+    if db is None:
+        sys.exit('Could not connect to the database')
+
+    started = time.perf_counter()
+    seed_officials(db, args.officials, rng)
+    user_ids = seed_users(db, args.users)
+    seed_applications(db, args.applications, user_ids, rng)
+    seed_seconds = time.perf_counter() - started
+
+    # Start from the seeded state: reload the directory and rebuild services
+    database_manager.reconnect()
+
+    tokens = [{'Authorization': f"Bearer {generate_jwt_token(str(user_id))}"}
+              for user_id in rng.sample(user_ids, min(len(user_ids), 500))]
+    ctx = {
+        'auth': lambda worker_rng: worker_rng.choice(tokens),
+        'users': args.users,
+        'registered': 0,
+        'run': int(time.time()),
+        'lock': threading.Lock()
+    }
+
+    drive(app, ctx, names, weights, args.warmup, args.concurrency, args.seed + 1)
+    latencies, statuses, wall = drive(app, ctx, names, weights, args.requests, args.concurrency, args.seed)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'backend': backend,
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'seed_seconds': round(seed_seconds, 2),
+        'scenarios': {name: summarize(latencies[name], statuses[name], wall) for name in names},
+        'total': summarize([sample for samples in latencies.values() for sample in samples],
+                           {status: sum(codes.get(status, 0) for codes in statuses.values())
+                            for codes in statuses.values() for status in codes}, wall)
+    }
+
+    status = 0
+    if args.baseline:
+        report['regressions'] = compare(report, args.baseline, args.max_regression)
+        status = 1 if report['regressions'] else 0
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+
+    database_manager.close_connection()
+    sys.exit(status)
+
+if __name__ == '__main__':
+    main()
@@ -17,24 +17,146 @@ class Config:
     # MongoDB Configuration
     MONGODB_URI = os.getenv('MONGODB_URI')
     DATABASE_NAME = os.getenv('DATABASE_NAME', 'gramaconnect')
+    MONGODB_HEARTBEAT_FREQUENCY_MS = int(os.getenv('MONGODB_HEARTBEAT_FREQUENCY_MS', '10000'))
+    
+    # MongoDB Connection Pool Configuration
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '100'))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '300000'))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '5000'))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '10000'))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    MONGODB_COMPRESSORS = os.getenv('MONGODB_COMPRESSORS', 'zstd,zlib')
+    MONGODB_RETRY_WRITES = os.getenv('MONGODB_RETRY_WRITES', 'true').lower() == 'true'
+    MONGODB_READ_PREFERENCE = os.getenv('MONGODB_READ_PREFERENCE', 'primary')
+    MONGODB_READ_CONCERN = os.getenv('MONGODB_READ_CONCERN', '')
+    MONGODB_WRITE_CONCERN = os.getenv('MONGODB_WRITE_CONCERN', 'majority')
+    MONGODB_PREWARM_CONNECTIONS = int(os.getenv('MONGODB_PREWARM_CONNECTIONS', '0'))
+    
+    # Command monitoring by query shape, and the slow query log threshold
+    MONGODB_QUERY_MONITOR = os.getenv('MONGODB_QUERY_MONITOR', 'true').lower() == 'true'
+    MONGODB_SLOW_QUERY_MS = float(os.getenv('MONGODB_SLOW_QUERY_MS', '100'))
+    
+    # Create registered indexes when connecting
+    MONGODB_AUTO_INDEX = os.getenv('MONGODB_AUTO_INDEX', 'true').lower() == 'true'
     
     # JWT Configuration
     JWT_EXPIRATION_DAYS = 7
     
+    # Grama Niladhari directory refresh (used when change streams are unavailable)
+    GN_DIRECTORY_POLL_SECONDS = float(os.getenv('GN_DIRECTORY_POLL_SECONDS', '30'))
+    GN_DIRECTORY_FULL_RELOAD_SECONDS = float(os.getenv('GN_DIRECTORY_FULL_RELOAD_SECONDS', '600'))
+    
+    # Request body limits: any request (Flask rejects larger bodies unread), single application
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', str(1024 * 1024)))
+    APPLICATION_MAX_BYTES = int(os.getenv('APPLICATION_MAX_BYTES', str(16 * 1024)))
+    
+    # Idempotency-Key: how long responses are replayed, how long an unfinished claim blocks duplicates
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(24 * 60 * 60)))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '10000'))
+    
+    # Largest number of applications accepted by /api/services/batch
+    BATCH_MAX_APPLICATIONS = int(os.getenv('BATCH_MAX_APPLICATIONS', '100'))
+    
+    # Application listing page sizes
+    APPLICATIONS_PAGE_SIZE = int(os.getenv('APPLICATIONS_PAGE_SIZE', '50'))
+    APPLICATIONS_MAX_PAGE_SIZE = int(os.getenv('APPLICATIONS_MAX_PAGE_SIZE', '100'))
+    
+    # Reference numbers leased from the counters collection per round trip
+    REFERENCE_NUMBER_BLOCK_SIZE = int(os.getenv('REFERENCE_NUMBER_BLOCK_SIZE', '100'))
+    
+    # Write-behind submissions: journal applications locally, write them to MongoDB in batches
+    SUBMISSION_QUEUE_ENABLED = os.getenv('SUBMISSION_QUEUE_ENABLED', 'false').lower() == 'true'
+    SUBMISSION_JOURNAL_DIR = os.getenv(
+        'SUBMISSION_JOURNAL_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'submission-journal')
+    )
+    SUBMISSION_BATCH_SIZE = int(os.getenv('SUBMISSION_BATCH_SIZE', '100'))
+    SUBMISSION_FLUSH_INTERVAL_MS = int(os.getenv('SUBMISSION_FLUSH_INTERVAL_MS', '50'))
+    SUBMISSION_SEGMENT_BYTES = int(os.getenv('SUBMISSION_SEGMENT_BYTES', str(16 * 1024 * 1024)))
+    SUBMISSION_MAX_RETRY_SECONDS = float(os.getenv('SUBMISSION_MAX_RETRY_SECONDS', '30'))
+    
+    # Password Hashing Configuration
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', str(os.cpu_count() or 1)))
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', str(4 * (os.cpu_count() or 1))))
+    BCRYPT_QUEUE_TIMEOUT_SECONDS = float(os.getenv('BCRYPT_QUEUE_TIMEOUT_SECONDS', '0.5'))
+    BCRYPT_RETRY_AFTER_SECONDS = int(os.getenv('BCRYPT_RETRY_AFTER_SECONDS', '1'))
+    
+    # Login/register rate limits as "requests/seconds" token buckets, per client IP and per email
+    LOGIN_RATE_LIMIT_IP = os.getenv('LOGIN_RATE_LIMIT_IP', '20/60')
+    LOGIN_RATE_LIMIT_EMAIL = os.getenv('LOGIN_RATE_LIMIT_EMAIL', '10/300')
+    REGISTER_RATE_LIMIT_IP = os.getenv('REGISTER_RATE_LIMIT_IP', '5/60')
+    REGISTER_RATE_LIMIT_EMAIL = os.getenv('REGISTER_RATE_LIMIT_EMAIL', '3/3600')
+    # 'memory' (per process) or 'mongodb' (shared by all workers)
+    RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+    # Proxies in front of the app whose X-Forwarded-For entries are trusted
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '0'))
+    # Login/register requests handled at once per process; the rest are shed before any work
+    AUTH_MAX_CONCURRENT = int(os.getenv('AUTH_MAX_CONCURRENT', str(2 * (os.cpu_count() or 1))))
+    
+    # Logging: JSON lines on stdout, written by a background thread
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')  # e.g. "app.database=DEBUG,pymongo=WARNING"
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')  # e.g. "app.utils.auth_utils=0.1"
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    
+    # Request metrics served on /metrics (per worker process)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Auth Cache Configuration (per process)
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+    TOKEN_CACHE_TTL_SECONDS = int(os.getenv('TOKEN_CACHE_TTL_SECONDS', '300'))
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+    
     @staticmethod
     def validate():
         """Validate that required configuration is present."""
         if not Config.MONGODB_URI:
             raise ValueError("MONGODB_URI environment variable is required")
         return True
+    
+    @classmethod
+    def mongo_client_options(cls) -> dict:
+        """Build MongoClient keyword arguments for this configuration profile."""
+        write_concern = cls.MONGODB_WRITE_CONCERN
+        
+        options = {
+            'maxPoolSize': cls.MONGODB_MAX_POOL_SIZE,
+            'minPoolSize': cls.MONGODB_MIN_POOL_SIZE,
+            'maxIdleTimeMS': cls.MONGODB_MAX_IDLE_TIME_MS,
+            'waitQueueTimeoutMS': cls.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            'connectTimeoutMS': cls.MONGODB_CONNECT_TIMEOUT_MS,
+            'socketTimeoutMS': cls.MONGODB_SOCKET_TIMEOUT_MS,
+            'serverSelectionTimeoutMS': cls.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            'heartbeatFrequencyMS': cls.MONGODB_HEARTBEAT_FREQUENCY_MS,
+            'retryWrites': cls.MONGODB_RETRY_WRITES,
+            'readPreference': cls.MONGODB_READ_PREFERENCE
+        }
+        
+        if cls.MONGODB_COMPRESSORS:
+            options['compressors'] = cls.MONGODB_COMPRESSORS
+        if cls.MONGODB_READ_CONCERN:
+            options['readConcernLevel'] = cls.MONGODB_READ_CONCERN
+        if write_concern:
+            options['w'] = int(write_concern) if write_concern.isdigit() else write_concern
+        
+        return options
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '10'))
 
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '10'))
+    MONGODB_PREWARM_CONNECTIONS = int(os.getenv('MONGODB_PREWARM_CONNECTIONS', '10'))
 
 # Configuration dictionary
 config = {
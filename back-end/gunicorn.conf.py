@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration for serving wsgi:app in production.
+
+Every setting can be overridden from the environment.
+"""
+import multiprocessing
+import os
+
+# Socket
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+backlog = int(os.getenv('GUNICORN_BACKLOG', '2048'))
+
+# Pre-fork worker processes, each with a thread pool
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Connection handling
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+# Load the app once in the master when enabled; workers then reconnect after fork
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+# Logging
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+
+def post_fork(server, worker):
+    """Give each worker its own MongoClient and background services."""
+    from app.app_factory import reinit_after_fork
+    reinit_after_fork()
+
+def worker_exit(server, worker):
+    """Flush queued submissions and close the worker's database connections on graceful shutdown."""
+    from app.services.submission_queue import submission_queue
+    from app.database import database_manager
+    submission_queue.stop(timeout=graceful_timeout / 2)
+    database_manager.close_connection()
@@ -0,0 +1,35 @@
+"""
+One-off migration of applications stored by the old flat layout
+
+Run this script once after upgrading, before serving traffic:
+    python migrate_legacy_applications.py
+
+Already converted applications are skipped, so it is safe to run again.
+"""
+
+import logging
+import sys
+from pymongo import MongoClient
+from config.config import Config
+from app.services.applications import backfill_legacy_applications
+from app.utils.log import configure_logging
+
+configure_logging()
+logger = logging.getLogger('migrate_legacy_applications')
+
+if not Config.MONGODB_URI:
+    logger.error('MONGODB_URI not found in environment variables')
+    sys.exit(1)
+
+client = MongoClient(Config.MONGODB_URI)
+
+try:
+    updated = backfill_legacy_applications(client[Config.DATABASE_NAME].applications)
+    logger.info('Converted applications to the current layout', extra={'count': updated})
+
+except Exception:
+    logger.exception('Application migration failed')
+    sys.exit(1)
+
+finally:
+    client.close()
@@ -4,21 +4,27 @@ Sample data script to populate Grama Niladhari officials in MongoDB
 Run this script to add test data for the Contact Grama Niladhari feature
 """
 
+import logging
 import os
 from pymongo import MongoClient
 from datetime import datetime
 from bson.objectid import ObjectId
+from app.models.grama_niladhari import normalized_fields
+from app.utils.log import configure_logging
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+configure_logging()
+logger = logging.getLogger('populate_grama_niladhari')
+
 # MongoDB connection
 MONGODB_URI = os.getenv('MONGODB_URI')
 DATABASE_NAME = 'gramaconnect'
 
 if not MONGODB_URI:
-    print("❌ MONGODB_URI not found in environment variables")
+    logger.error('MONGODB_URI not found in environment variables')
     exit(1)
 
 # Connect to MongoDB
@@ -26,9 +32,9 @@ try:
     client = MongoClient(MONGODB_URI)
     db = client[DATABASE_NAME]
     gn_collection = db.grama_niladhari
-    print("✅ Connected to MongoDB successfully!")
+    logger.info('Connected to MongoDB', extra={'database': DATABASE_NAME})
 except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
+    logger.error('MongoDB connection failed', extra={'error': str(e)})
     exit(1)
 
 # Sample Grama Niladhari officials data - Comprehensive coverage across Sri Lanka
@@ -937,31 +943,31 @@ sample_officials = [
 try:
     # Clear existing data (for testing)
     result = gn_collection.delete_many({})
-    print(f"🗑️ Cleared {result.deleted_count} existing records")
+    logger.info('Cleared existing officials', extra={'count': result.deleted_count})
+    
+    # Add the normalized search fields used by the directory endpoints
+    for official in sample_officials:
+        official.update(normalized_fields(official))
     
     # Insert new sample data
     result = gn_collection.insert_many(sample_officials)
-    print(f"✅ Inserted {len(result.inserted_ids)} Grama Niladhari officials")
+    logger.info('Inserted Grama Niladhari officials', extra={'count': len(result.inserted_ids)})
     
     # Verify insertion
     count = gn_collection.count_documents({})
-    print(f"📊 Total officials in database: {count}")
     
     # Show sample data by district
-    print("\n📍 Officials by District:")
     pipeline = [
         {"$group": {"_id": "$district", "count": {"$sum": 1}}},
         {"$sort": {"_id": 1}}
     ]
+    by_district = {district_data['_id']: district_data['count'] for district_data in gn_collection.aggregate(pipeline)}
     
-    for district_data in gn_collection.aggregate(pipeline):
-        print(f"   {district_data['_id']}: {district_data['count']} officials")
+    logger.info('Sample data insertion completed', extra={'count': count, 'by_district': by_district})
     
-    print("\n🎉 Sample data insertion completed successfully!")
-    
-except Exception as e:
-    print(f"❌ Error inserting sample data: {e}")
+except Exception:
+    logger.exception('Error inserting sample data')
 
 finally:
     client.close()
-    print("🔗 MongoDB connection closed")
+    logger.info('MongoDB connection closed')
@@ -24,11 +24,11 @@ def main():
     # Create app instance
     app = create_app(config)
     
-    # Run the application
+    # Run the development server (use wsgi.py with gunicorn in production)
     app.run(
-        debug=True,
-        host='127.0.0.1',
-        port=5000,
+        debug=config.DEBUG,
+        host=os.getenv('HOST', '127.0.0.1'),
+        port=int(os.getenv('PORT', '5000')),
         use_reloader=False
     )
 
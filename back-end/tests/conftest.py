@@ -0,0 +1,94 @@
+"""
+Shared fixtures: the application factory on an in-memory MongoDB.
+
+Config reads the environment when it is first imported, so the test
+settings are applied here before any app module is loaded. Every test gets
+a fresh mongomock store and empty process-wide caches and rate limits.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['MONGODB_URI'] = 'mongodb://tests'
+os.environ['DATABASE_NAME'] = 'gramaconnect_test'
+os.environ['BCRYPT_ROUNDS'] = '4'
+os.environ['LOG_LEVEL'] = 'CRITICAL'
+os.environ['SUBMISSION_QUEUE_ENABLED'] = 'false'
+os.environ['METRICS_ENABLED'] = 'false'
+
+import mongomock
+import pytest
+from config.config import Config, DevelopmentConfig
+from app import database
+from app.app_factory import create_app
+from app.utils.auth_utils import generate_jwt_token, token_cache, user_cache
+from app.utils.idempotency import idempotency_store
+from app.utils.rate_limit import MemoryRateLimitStore, auth_rate_limiter
+
+@pytest.fixture
+def mongo_store(monkeypatch):
+    """A fresh in-memory server that every MongoClient created in the test connects to."""
+    store = mongomock.store.ServerStore()
+
+    class InMemoryMongoClient(mongomock.MongoClient):
+        """mongomock client accepting the real client's arguments."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(_store=store)
+
+    monkeypatch.setattr(database, 'MongoClient', InMemoryMongoClient)
+    return store
+
+@pytest.fixture
+def app(mongo_store):
+    """The Flask app, connected to the in-memory database."""
+    application = create_app(DevelopmentConfig)
+    application.config['TESTING'] = True
+
+    for cache in (idempotency_store.cache, token_cache, user_cache):
+        cache.clear()
+    auth_rate_limiter.store = MemoryRateLimitStore(Config.RATE_LIMIT_MAX_KEYS)
+
+    # Connect to this test's store; the on-connect hook rebuilds the services
+    database.database_manager.reconnect()
+
+    yield application
+
+    from app.services.grama_niladhari_directory import grama_niladhari_directory
+    grama_niladhari_directory.stop()
+    database.database_manager.client = None
+    database.database_manager.db = None
+
+@pytest.fixture
+def client(app):
+    """Test client for the app."""
+    return app.test_client()
+
+@pytest.fixture
+def db(app):
+    """The app's database."""
+    return database.database_manager.get_database()
+
+@pytest.fixture
+def user_id(db):
+    """Id of a stored citizen user."""
+    return db.users.insert_one({
+        'name': 'Kasun Perera',
+        'email': 'kasun@example.lk',
+        'role': 'citizen'
+    }).inserted_id
+
+@pytest.fixture
+def auth_headers(user_id):
+    """Authorization header for the stored user."""
+    return {'Authorization': f"Bearer {generate_jwt_token(str(user_id))}"}
+
+@pytest.fixture
+def other_auth_headers(db):
+    """Authorization header for a second stored user."""
+    other_id = db.users.insert_one({
+        'name': 'Nimali Silva',
+        'email': 'nimali@example.lk',
+        'role': 'citizen'
+    }).inserted_id
+    return {'Authorization': f"Bearer {generate_jwt_token(str(other_id))}"}
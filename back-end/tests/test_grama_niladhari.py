@@ -0,0 +1,108 @@
+"""
+Grama Niladhari directory responses: ETags, 304s, echoed queries and the database fallback.
+"""
+from datetime import datetime
+import pytest
+from app.models.grama_niladhari import normalized_fields
+from app.services.grama_niladhari_directory import GramaNiladhariDirectory, grama_niladhari_directory
+
+def official(index, district, name, **fields):
+    document = {
+        'name': name,
+        'designation': 'Grama Niladhari',
+        'employee_id': f'GN{index:06d}',
+        'district': district,
+        'divisional_secretariat': f'{district} DS',
+        'grama_niladhari_division': f'{district} {index:03d}',
+        'division_code': f'{district[:3].upper()}{index:05d}',
+        'status': 'active',
+        'updated_at': datetime(2025, 8, 16),
+        **fields
+    }
+    document.update(normalized_fields(document))
+    return document
+
+@pytest.fixture
+def officials(db):
+    db.grama_niladhari.insert_many([
+        official(1, 'Colombo', 'Mr. A.B. Perera'),
+        official(2, 'Colombo', 'Ms. C.D. Silva'),
+        official(3, 'Kandy', 'Mr. E.F. Perera'),
+        official(4, 'Kandy', 'Ms. G.H. Bandara', status='inactive')
+    ])
+    grama_niladhari_directory.load()
+
+def test_district_listing_has_a_strong_etag(client, auth_headers, officials):
+    response = client.get('/api/grama-niladhari/district/Colombo', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 2
+    assert response.headers['ETag'].startswith('"')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+def test_matching_if_none_match_gets_304_without_a_body(client, auth_headers, officials):
+    etag = client.get('/api/grama-niladhari/district/Colombo', headers=auth_headers).headers['ETag']
+
+    response = client.get('/api/grama-niladhari/district/Colombo', headers={**auth_headers, 'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+def test_stale_etag_gets_the_new_listing(client, auth_headers, officials, db):
+    etag = client.get('/api/grama-niladhari/district/Kandy', headers=auth_headers).headers['ETag']
+    db.grama_niladhari.insert_one(official(5, 'Kandy', 'Mr. I.J. Herath'))
+    grama_niladhari_directory.load()
+
+    response = client.get('/api/grama-niladhari/district/Kandy', headers={**auth_headers, 'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 2
+    assert response.headers['ETag'] != etag
+
+def test_queries_are_echoed_as_sent(client, auth_headers, officials):
+    exact = client.get('/api/grama-niladhari/district/Colombo', headers=auth_headers)
+    shouted = client.get('/api/grama-niladhari/district/COLOMBO', headers=auth_headers)
+
+    assert exact.get_json()['district'] == 'Colombo'
+    assert shouted.get_json()['district'] == 'COLOMBO'
+    assert shouted.get_json()['grama_niladhari_officials'] == exact.get_json()['grama_niladhari_officials']
+    # The bodies differ, so their ETags must too
+    assert shouted.headers['ETag'] != exact.headers['ETag']
+
+def test_search_echoes_criteria_and_supports_304(client, auth_headers, officials):
+    path = '/api/grama-niladhari/search?district=kandy&name=per'
+    response = client.get(path, headers=auth_headers)
+    body = response.get_json()
+
+    assert body['search_criteria'] == {'district': 'kandy', 'division': None, 'name': 'per'}
+    assert [o['name'] for o in body['grama_niladhari_officials']] == ['Mr. E.F. Perera']
+    assert client.get(path, headers={**auth_headers, 'If-None-Match': response.headers['ETag']}).status_code == 304
+
+@pytest.mark.parametrize('path', ['/api/grama-niladhari/employee/GN000002', '/api/grama-niladhari/division/COL00002'])
+def test_single_official_lookups(client, auth_headers, officials, path):
+    response = client.get(path, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['grama_niladhari_official']['name'] == 'Ms. C.D. Silva'
+    assert client.get(path, headers={**auth_headers, 'If-None-Match': response.headers['ETag']}).status_code == 304
+
+@pytest.mark.parametrize('path', ['/api/grama-niladhari/employee/GN000004', '/api/grama-niladhari/employee/GN999999'])
+def test_inactive_or_unknown_officials_are_not_found(client, auth_headers, officials, path):
+    assert client.get(path, headers=auth_headers).status_code == 404
+
+def test_requires_authentication(client, officials):
+    assert client.get('/api/grama-niladhari/district/Colombo').status_code == 401
+
+def test_falls_back_to_the_database_without_a_snapshot(client, auth_headers, officials, monkeypatch):
+    def unavailable(self):
+        raise Exception('Database not connected')
+
+    monkeypatch.setattr(GramaNiladhariDirectory, 'snapshot', property(unavailable))
+
+    response = client.get('/api/grama-niladhari/district/COLOMBO', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['district'] == 'COLOMBO'
+    assert response.get_json()['count'] == 2
+    assert 'ETag' not in response.headers
@@ -0,0 +1,95 @@
+"""
+Idempotency-Key replays on application submission and registration.
+"""
+import pytest
+from app.utils.idempotency import idempotency_store
+
+MARRIAGE_CERTIFICATE = {
+    'applicantName': 'Kasun Perera', 'spouseName': 'Nimali Silva', 'marriageDate': '2024-02-14',
+    'marriagePlace': 'Kandy', 'applicantNIC': '199012345678', 'spouseNIC': '923456789V'
+}
+
+REGISTRATION = {'name': 'Nimali Silva', 'email': 'nimali@example.lk', 'password': 'secret-password'}
+
+def submit(client, headers, key, data=MARRIAGE_CERTIFICATE):
+    return client.post('/api/services/marriage-certificate', json=data,
+                       headers={**headers, 'Idempotency-Key': key})
+
+def test_retry_replays_the_stored_application(client, db, auth_headers):
+    first = submit(client, auth_headers, 'retry-1')
+    second = submit(client, auth_headers, 'retry-1')
+
+    assert first.status_code == second.status_code == 201
+    assert 'Idempotent-Replayed' not in first.headers
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json()['reference_number'] == first.get_json()['reference_number']
+    assert db.applications.count_documents({}) == 1
+
+def test_replay_survives_a_cold_cache(client, db, auth_headers):
+    first = submit(client, auth_headers, 'retry-2')
+    # Another worker, or this one after a restart, only has the stored record
+    idempotency_store.cache.clear()
+
+    second = submit(client, auth_headers, 'retry-2')
+
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json()['application_id'] == first.get_json()['application_id']
+    assert db.applications.count_documents({}) == 1
+
+def test_new_key_submits_again(client, db, auth_headers):
+    submit(client, auth_headers, 'key-a')
+    submit(client, auth_headers, 'key-b')
+
+    assert db.applications.count_documents({}) == 2
+
+def test_reused_key_with_a_different_body_is_refused(client, db, auth_headers):
+    submit(client, auth_headers, 'retry-3')
+
+    response = submit(client, auth_headers, 'retry-3', {**MARRIAGE_CERTIFICATE, 'marriagePlace': 'Galle'})
+
+    assert response.status_code == 422
+    assert db.applications.count_documents({}) == 1
+
+def test_keys_are_scoped_to_the_user(client, db, auth_headers, other_auth_headers):
+    submit(client, auth_headers, 'shared-key')
+    response = submit(client, other_auth_headers, 'shared-key')
+
+    assert 'Idempotent-Replayed' not in response.headers
+    assert db.applications.count_documents({}) == 2
+
+def test_validation_errors_are_replayed_without_storing_an_application(client, db, auth_headers):
+    invalid = {**MARRIAGE_CERTIFICATE, 'applicantNIC': 'bad'}
+
+    first = submit(client, auth_headers, 'invalid', invalid)
+    second = submit(client, auth_headers, 'invalid', invalid)
+
+    assert first.status_code == second.status_code == 400
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert db.applications.count_documents({}) == 0
+
+def test_overlong_key_is_rejected(client, auth_headers):
+    response = submit(client, auth_headers, 'k' * 256)
+
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('cold_cache', [False, True])
+def test_registration_replay_returns_the_same_user_with_a_new_token(client, db, cold_cache):
+    headers = {'Idempotency-Key': 'register-1'}
+    first = client.post('/api/auth/register', json=REGISTRATION, headers=headers)
+    if cold_cache:
+        idempotency_store.cache.clear()
+
+    second = client.post('/api/auth/register', json=REGISTRATION, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json()['user']['id'] == first.get_json()['user']['id']
+    assert second.get_json()['token']
+    assert db.users.count_documents({}) == 1
+
+def test_registration_tokens_are_never_stored(client, db):
+    response = client.post('/api/auth/register', json=REGISTRATION, headers={'Idempotency-Key': 'register-2'})
+
+    record = db.idempotency_keys.find_one()
+    assert record['saved'] == {'user_id': response.get_json()['user']['id']}
+    assert 'body' not in record
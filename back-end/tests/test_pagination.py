@@ -0,0 +1,105 @@
+"""
+Keyset pagination of application listings.
+"""
+from datetime import datetime, timedelta
+import mongomock
+import pytest
+from bson import ObjectId
+from app.services.applications import new_application
+from app.utils.pagination import PaginationError, decode_cursor, encode_cursor, paginate, parse_limit
+
+def insert_applications(collection, user_id, submitted_dates, first=1):
+    """Store one marriage certificate application per submission date, numbered from first."""
+    applications = [
+        new_application('marriage_certificate', user_id, {'applicant_name': f'Applicant {number}'},
+                        f'MC-20250816-{number:06d}', submitted)
+        for number, submitted in enumerate(submitted_dates, start=first)
+    ]
+    collection.insert_many(applications)
+    return applications
+
+def test_cursor_round_trip_keeps_millisecond_precision():
+    document_id = ObjectId()
+    submitted = datetime(2025, 8, 16, 7, 31, 15, 123456)
+
+    sort_value, decoded_id = decode_cursor(encode_cursor(submitted, document_id))
+
+    assert sort_value == datetime(2025, 8, 16, 7, 31, 15, 123000)
+    assert decoded_id == document_id
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'e30', ''])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor)
+
+@pytest.mark.parametrize('value, expected', [(None, 50), ('', 50), ('1', 1), ('100', 100)])
+def test_parse_limit(value, expected):
+    assert parse_limit(value, 50, 100) == expected
+
+@pytest.mark.parametrize('value', ['0', '101', 'ten'])
+def test_parse_limit_rejects_out_of_range(value):
+    with pytest.raises(PaginationError):
+        parse_limit(value, 50, 100)
+
+def test_paginate_walks_ties_without_gaps_or_repeats():
+    collection = mongomock.MongoClient().db.applications
+    user_id = ObjectId()
+    same_time = datetime(2025, 8, 16, 9, 0)
+    # Several applications share a submission time; _id breaks the tie
+    dates = [same_time] * 5 + [same_time - timedelta(days=day) for day in range(1, 6)]
+    applications = insert_applications(collection, user_id, dates)
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = paginate(collection, {'user_id': user_id}, 'submitted_date', 3, cursor)
+        assert len(page) <= 3
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    expected = sorted(applications, key=lambda a: (a['submitted_date'], a['_id']), reverse=True)
+    assert [a['_id'] for a in seen] == [a['_id'] for a in expected]
+
+def test_paginate_last_full_page_has_no_cursor():
+    collection = mongomock.MongoClient().db.applications
+    user_id = ObjectId()
+    insert_applications(collection, user_id, [datetime(2025, 8, day) for day in range(1, 5)])
+
+    page, cursor = paginate(collection, {'user_id': user_id}, 'submitted_date', 4)
+
+    assert len(page) == 4
+    assert cursor is None
+
+def test_list_endpoint_pages_through_own_applications(client, db, user_id, auth_headers):
+    now = datetime.utcnow().replace(microsecond=0)
+    insert_applications(db.applications, user_id, [now - timedelta(minutes=minute) for minute in range(5)])
+    insert_applications(db.applications, ObjectId(), [now], first=6)
+
+    first = client.get('/api/services/applications?limit=2', headers=auth_headers).get_json()
+    assert first['count'] == 2
+    assert first['next_cursor']
+
+    references = [a['reference_number'] for a in first['applications']]
+    cursor = first['next_cursor']
+    while cursor:
+        page = client.get('/api/services/applications', query_string={'limit': 2, 'cursor': cursor},
+                          headers=auth_headers).get_json()
+        references.extend(a['reference_number'] for a in page['applications'])
+        cursor = page['next_cursor']
+
+    assert references == [f'MC-20250816-{index:06d}' for index in range(1, 6)]
+
+def test_list_endpoint_summary_projection(client, db, user_id, auth_headers):
+    insert_applications(db.applications, user_id, [datetime.utcnow()])
+
+    response = client.get('/api/services/applications?summary=true', headers=auth_headers)
+
+    application = response.get_json()['applications'][0]
+    assert set(application) == {'_id', 'service_type', 'status', 'submitted_date', 'reference_number'}
+
+@pytest.mark.parametrize('query', ['cursor=garbage', 'limit=0', 'limit=1000', 'fields=password'])
+def test_list_endpoint_rejects_invalid_parameters(client, auth_headers, query):
+    response = client.get(f'/api/services/applications?{query}', headers=auth_headers)
+
+    assert response.status_code == 400
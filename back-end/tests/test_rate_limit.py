@@ -0,0 +1,119 @@
+"""
+Token-bucket rate limits and load shedding on the auth endpoints.
+"""
+import threading
+from types import SimpleNamespace
+import pytest
+from config.config import Config
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryRateLimitStore, auth_rate_limiter, parse_limit
+
+REGISTRATION = {'name': 'Nimali Silva', 'email': 'nimali@example.lk', 'password': 'secret-password'}
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+def test_parse_limit():
+    assert parse_limit('20/60') == (20, 20 / 60)
+    assert parse_limit('5') == (5, 5.0)
+
+@pytest.mark.parametrize('value', ['0/60', '5/0', 'five/60'])
+def test_parse_limit_rejects_malformed_limits(value):
+    with pytest.raises(ValueError):
+        parse_limit(value)
+
+def test_bucket_allows_its_capacity_then_refills(clock):
+    store = MemoryRateLimitStore(max_keys=100)
+    capacity, rate = parse_limit('3/60')
+
+    assert [store.take('ip:1', capacity, rate)[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = store.take('ip:1', capacity, rate)
+    assert not allowed
+    assert retry_after == pytest.approx(20)
+
+    clock.now += 20
+    assert store.take('ip:1', capacity, rate)[0]
+    assert not store.take('ip:1', capacity, rate)[0]
+
+def test_buckets_are_independent_per_key(clock):
+    store = MemoryRateLimitStore(max_keys=100)
+
+    assert store.take('ip:1', 1, 1 / 60)[0]
+    assert not store.take('ip:1', 1, 1 / 60)[0]
+    assert store.take('ip:2', 1, 1 / 60)[0]
+
+def test_least_recently_used_buckets_are_dropped(clock):
+    store = MemoryRateLimitStore(max_keys=2, stripes=1)
+
+    store.take('a', 1, 1 / 60)
+    store.take('b', 1, 1 / 60)
+    store.take('c', 1, 1 / 60)
+
+    # 'a' was forgotten, so it starts with a full bucket again
+    assert store.take('a', 1, 1 / 60)[0]
+    assert not store.take('c', 1, 1 / 60)[0]
+
+def test_login_is_limited_per_email(client):
+    capacity, _ = parse_limit(Config.LOGIN_RATE_LIMIT_EMAIL)
+    credentials = {'email': 'Someone@Example.lk', 'password': 'wrong-password'}
+
+    statuses = [client.post('/api/auth/login', json=credentials).status_code for _ in range(capacity)]
+    limited = client.post('/api/auth/login', json={**credentials, 'email': ' someone@example.lk'})
+
+    assert 429 not in statuses
+    assert limited.status_code == 429
+    assert int(limited.headers['Retry-After']) >= 1
+    # Other emails from the same address still get through
+    assert client.post('/api/auth/login', json={**credentials, 'email': 'other@example.lk'}).status_code != 429
+
+def test_login_is_limited_per_ip(client):
+    capacity, _ = parse_limit(Config.LOGIN_RATE_LIMIT_IP)
+
+    for index in range(capacity):
+        client.post('/api/auth/login', json={'email': f'user{index}@example.lk', 'password': 'x'})
+    limited = client.post('/api/auth/login', json={'email': 'last@example.lk', 'password': 'x'})
+    other_ip = client.post('/api/auth/login', json={'email': 'last@example.lk', 'password': 'x'},
+                           environ_base={'REMOTE_ADDR': '10.0.0.2'})
+
+    assert limited.status_code == 429
+    assert other_ip.status_code != 429
+
+def test_register_replays_are_exempt(client):
+    capacity, _ = parse_limit(Config.REGISTER_RATE_LIMIT_EMAIL)
+    headers = {'Idempotency-Key': 'register-retry'}
+
+    statuses = [client.post('/api/auth/register', json=REGISTRATION, headers=headers).status_code
+                for _ in range(capacity + 2)]
+    new_key = client.post('/api/auth/register', json=REGISTRATION, headers={'Idempotency-Key': 'another-key'})
+
+    assert statuses == [201] * (capacity + 2)
+    # Only the first request counted, so a new key is refused as a duplicate, not limited
+    assert new_key.status_code == 409
+
+def test_register_without_a_key_is_limited(client):
+    capacity, _ = parse_limit(Config.REGISTER_RATE_LIMIT_EMAIL)
+
+    statuses = [client.post('/api/auth/register', json=REGISTRATION).status_code for _ in range(capacity + 1)]
+
+    assert statuses == [201] + [409] * (capacity - 1) + [429]
+
+def test_requests_beyond_the_concurrency_cap_are_shed(client, monkeypatch):
+    monkeypatch.setattr(auth_rate_limiter, '_slots', threading.BoundedSemaphore(1))
+    auth_rate_limiter._slots.acquire()
+
+    response = client.post('/api/auth/login', json={'email': 'someone@example.lk', 'password': 'x'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(Config.BCRYPT_RETRY_AFTER_SECONDS)
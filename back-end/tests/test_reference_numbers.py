@@ -0,0 +1,94 @@
+"""
+Reference numbers leased in blocks from the counters collection.
+"""
+import re
+import threading
+from datetime import datetime
+import mongomock
+import pytest
+from app.services import reference_numbers
+from app.services.reference_numbers import ReferenceNumberGenerator, format_reference_number
+
+@pytest.fixture
+def counters():
+    return mongomock.MongoClient().db.counters
+
+def generator(counters, block_size):
+    generator = ReferenceNumberGenerator(block_size=block_size)
+    generator.bind(counters)
+    return generator
+
+def sequence(reference_number):
+    return int(reference_number.rsplit('-', 1)[1])
+
+def test_format_cannot_match_legacy_timestamp_numbers():
+    number = format_reference_number('MC', '20250816', 103045)
+
+    assert number == 'MC-20250816-103045'
+    assert not re.fullmatch(r'MC\d{14}', number)
+
+def test_numbers_come_from_one_lease_per_block(counters):
+    numbers = generator(counters, 10).allocate('MC', 4)
+
+    assert [sequence(number) for number in numbers] == [1, 2, 3, 4]
+    assert all(number.startswith(f"MC-{datetime.utcnow():%Y%m%d}-") for number in numbers)
+    assert counters.find_one()['seq'] == 10
+
+def test_a_new_block_is_leased_when_one_runs_out(counters):
+    numbers = generator(counters, 3)
+
+    issued = [numbers.next('MC') for _ in range(7)]
+
+    assert [sequence(number) for number in issued] == list(range(1, 8))
+    assert counters.find_one()['seq'] == 9
+
+def test_large_allocations_lease_one_block_of_the_needed_size(counters):
+    numbers = generator(counters, 5).allocate('CC', 12)
+
+    assert [sequence(number) for number in numbers] == list(range(1, 13))
+    assert counters.find_one()['seq'] == 12
+
+def test_prefixes_have_separate_sequences(counters):
+    numbers = generator(counters, 10)
+
+    assert sequence(numbers.next('MC')) == 1
+    assert sequence(numbers.next('VR')) == 1
+    assert sequence(numbers.next('MC')) == 2
+
+def test_processes_sharing_counters_never_issue_the_same_number(counters):
+    workers = [generator(counters, 5) for _ in range(3)]
+
+    issued = [worker.next('MC') for _ in range(8) for worker in workers]
+
+    assert len(set(issued)) == len(issued)
+
+def test_concurrent_threads_never_issue_the_same_number(counters):
+    numbers = generator(counters, 7)
+    issued = []
+    lock = threading.Lock()
+
+    def issue():
+        batch = [numbers.next('MC') for _ in range(50)]
+        with lock:
+            issued.extend(batch)
+
+    threads = [threading.Thread(target=issue) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(sequence(number) for number in issued) == list(range(1, 201))
+
+def test_a_new_day_starts_a_new_sequence(counters, monkeypatch):
+    numbers = generator(counters, 10)
+    numbers.next('MC')
+
+    class NextDay(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime(2099, 1, 2)
+
+    monkeypatch.setattr(reference_numbers, 'datetime', NextDay)
+
+    assert numbers.next('MC') == 'MC-20990102-000001'
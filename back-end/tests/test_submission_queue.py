@@ -0,0 +1,151 @@
+"""
+Write-behind submission queue: journaling, replay after a crash, retries and rejects.
+"""
+import glob
+import os
+import time
+import bson
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+from app.services.submission_queue import REJECTED_FILE, SEGMENT_SUFFIX, SubmissionQueue
+
+class ApplicationsCollection:
+    """In-memory applications collection raising write errors shaped like the server's."""
+
+    def __init__(self, outages=0, poison=()):
+        """
+        Args:
+            outages (int): insert_many calls that fail with a network error first
+            poison: _ids whose batch fails as a whole with a non-retryable error
+        """
+        self.documents = {}
+        self.outages = outages
+        self.poison = set(poison)
+        self.calls = 0
+
+    def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        if self.outages:
+            self.outages -= 1
+            raise AutoReconnect('connection refused')
+        if any(document['_id'] in self.poison for document in documents):
+            raise OperationFailure('BSONObj size is invalid', code=10334)
+
+        errors = []
+        for index, document in enumerate(documents):
+            if document['_id'] in self.documents:
+                key = '_id'
+            elif any(stored['reference_number'] == document['reference_number']
+                     for stored in self.documents.values()):
+                key = 'reference_number'
+            elif document.get('status') == 'invalid':
+                errors.append({'index': index, 'code': 121, 'errmsg': 'Document failed validation'})
+                continue
+            else:
+                self.documents[document['_id']] = document
+                continue
+            errors.append({'index': index, 'code': 11000, 'keyPattern': {key: 1},
+                           'errmsg': f'E11000 duplicate key error index: {key}'})
+
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'writeConcernErrors': [],
+                                  'nInserted': len(documents) - len(errors)})
+
+def application(number, **fields):
+    return {'_id': ObjectId(), 'reference_number': f'MC-20250816-{number:06d}', 'status': 'pending', **fields}
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+def rejected(directory):
+    path = os.path.join(directory, REJECTED_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as file:
+        return list(bson.decode_file_iter(file))
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path)
+
+@pytest.fixture
+def queue(journal):
+    queue = SubmissionQueue(journal, batch_size=10, flush_interval=0.01, max_retry_seconds=0.1)
+    yield queue
+    queue.stop(timeout=2)
+
+def test_submitted_applications_are_written_and_the_journal_emptied(queue, journal):
+    collection = ApplicationsCollection()
+    queue.start(collection)
+    applications = [application(number) for number in range(1, 26)]
+
+    for document in applications:
+        queue.submit(document)
+    wait_until(lambda: len(collection.documents) == 25 and len(queue) == 0)
+
+    assert set(collection.documents) == {document['_id'] for document in applications}
+    segments = glob.glob(os.path.join(journal, '*' + SEGMENT_SUFFIX))
+    assert [os.path.getsize(path) for path in segments] == [0]
+
+def test_leftover_segments_are_replayed_on_start(queue, journal):
+    applications = [application(number) for number in range(1, 4)]
+    leftover = os.path.join(journal, f'1-99999-deadbeef{SEGMENT_SUFFIX}')
+    with open(leftover, 'wb') as file:
+        for document in applications:
+            file.write(bson.encode(document))
+        # A record torn by the crash was never acknowledged
+        file.write(bson.encode(application(4))[:10])
+
+    # The first application was written before the crash
+    collection = ApplicationsCollection()
+    collection.documents[applications[0]['_id']] = applications[0]
+    queue.start(collection)
+    wait_until(lambda: len(queue) == 0)
+
+    assert set(collection.documents) == {document['_id'] for document in applications}
+    assert not os.path.exists(leftover)
+    assert rejected(journal) == []
+
+def test_transient_failures_are_retried(queue, journal):
+    collection = ApplicationsCollection(outages=3)
+    queue.start(collection)
+
+    queue.submit(application(1))
+    wait_until(lambda: len(collection.documents) == 1)
+
+    assert collection.calls == 4
+    assert rejected(journal) == []
+
+def test_refused_applications_are_rejected_without_blocking_the_queue(queue, journal):
+    collection = ApplicationsCollection()
+    queue.start(collection)
+    queue.submit(application(1))
+    wait_until(lambda: len(collection.documents) == 1)
+
+    duplicate_reference = application(1)
+    invalid = application(2, status='invalid')
+    valid = application(3)
+    for document in (duplicate_reference, invalid, valid):
+        queue.submit(document)
+    wait_until(lambda: len(queue) == 0 and len(rejected(journal)) == 2)
+
+    assert valid['_id'] in collection.documents
+    assert {document['_id'] for document in rejected(journal)} == {duplicate_reference['_id'], invalid['_id']}
+
+def test_a_permanently_failing_batch_is_split_to_reject_only_the_culprit(queue, journal):
+    poisoned = application(2)
+    collection = ApplicationsCollection(poison=[poisoned['_id']])
+    others = [application(1), application(3)]
+
+    # Journal all three before the writer starts so they share a batch
+    for document in (others[0], poisoned, others[1]):
+        queue.submit(document)
+    queue.start(collection)
+    wait_until(lambda: len(queue) == 0 and len(rejected(journal)) == 1)
+
+    assert set(collection.documents) == {document['_id'] for document in others}
+    assert rejected(journal)[0]['_id'] == poisoned['_id']
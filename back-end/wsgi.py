@@ -0,0 +1,16 @@
+"""
+Production WSGI entry point for the GramaConnect Flask application.
+
+Serve with a pre-fork server, for example:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.app_factory import create_app
+from config.config import ProductionConfig
+
+app = create_app(ProductionConfig)
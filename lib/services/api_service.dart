@@ -362,15 +362,27 @@ class ApiService {
     }
   }
 
-  static Future<List<Map<String, dynamic>>> getUserApplications({
+  // One page of the user's applications, newest first. Returns the page's
+  // 'applications' and the 'next_cursor' to pass as cursor for the next page
+  // (null on the last page); list screens fetch it when scrolled to the end.
+  static Future<Map<String, dynamic>> getUserApplications({
     required String token,
+    String? cursor,
+    int limit = 20,
   }) async {
     try {
       print('🔍 Getting user applications from: $baseUrl/api/services/applications');
 
+      final uri = Uri.parse('$baseUrl/api/services/applications').replace(
+        queryParameters: {
+          'limit': '$limit',
+          if (cursor != null) 'cursor': cursor,
+        },
+      );
+
       final response = await http
           .get(
-            Uri.parse('$baseUrl/api/services/applications'),
+            uri,
             headers: {
               ...headers,
               'Authorization': 'Bearer $token',
@@ -382,7 +394,10 @@ class ApiService {
 
       if (response.statusCode == 200) {
         final data = jsonDecode(response.body);
-        return List<Map<String, dynamic>>.from(data['applications']);
+        return {
+          'applications': List<Map<String, dynamic>>.from(data['applications']),
+          'next_cursor': data['next_cursor'],
+        };
       } else {
         final error = jsonDecode(response.body);
         throw Exception(error['error'] ?? 'Failed to get applications');